@@ -0,0 +1,43 @@
+"""Compare two benchmark result files from ``bench.run``::
+
+    python -m bench.compare before.json after.json
+"""
+import json
+import sys
+
+
+def _flatten(data, prefix="") -> dict:
+    """Flatten nested dicts to dotted keys, keeping numeric leaves."""
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def main() -> None:
+    """Print every metric of both runs with the relative change."""
+    if len(sys.argv) != 3:
+        sys.exit(__doc__)
+
+    with open(sys.argv[1], encoding="utf-8") as file:
+        before = json.load(file)
+    with open(sys.argv[2], encoding="utf-8") as file:
+        after = json.load(file)
+
+    print(f"{before['meta']['revision']} -> {after['meta']['revision']}")
+    old, new = _flatten(before["results"]), _flatten(after["results"])
+    width = max(map(len, old.keys() | new.keys()), default=0)
+    for key in sorted(old.keys() | new.keys()):
+        a, b = old.get(key), new.get(key)
+        change = ""
+        if a and b is not None:
+            change = f"{(b - a) / a * 100:+.1f}%"
+        print(f"{key:<{width}}  {a!s:>12}  {b!s:>12}  {change:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Local mock of the HiLife cloud for offline benchmarks.
+
+Serves the four endpoints from ``const.py`` on plain HTTP with
+configurable latency, error rate, token lifetime and door counts::
+
+    python -m bench.mock_cloud --port 8080 --communities 3 --doors 500
+"""
+import argparse
+import asyncio
+import random
+import secrets
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+from custom_components.hilife_door import api as hilife_api
+from custom_components.hilife_door.const import (
+    API_CARD_NOS,
+    API_GET_DOORS,
+    API_LOGIN,
+    API_OPEN_DOOR,
+)
+
+
+class MockCloud:
+    """In-process HiLife cloud."""
+
+    def __init__(
+        self,
+        communities: int = 1,
+        doors: int = 50,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        token_ttl: int = 3600,
+        seed: int = 0,
+    ):
+        """Initialize the mock cloud; ``latency`` and ``jitter`` are seconds."""
+        self.communities = communities
+        self.doors = doors
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        # Bump to rename every door, so the next door list differs
+        self.revision = 0
+        self.requests = Counter()
+        self._random = random.Random(seed)
+        self._tokens: dict = {}
+        self._refresh_tokens: set = set()
+        self._runner = None
+        self.base_url = None
+
+    @staticmethod
+    def community_ids(count: int) -> list:
+        """Return the community ids served for ``count`` communities."""
+        return [1000 + index for index in range(count)]
+
+    async def _delay(self) -> None:
+        """Simulate network and server time."""
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def _fail(self) -> bool:
+        """Return True if this request should fail with a 503."""
+        return self.error_rate and self._random.random() < self.error_rate
+
+    def _authorized(self, request: web.Request) -> bool:
+        """Check the access_token query parameter."""
+        expires = self._tokens.get(request.query.get("access_token"))
+        return expires is not None and time.monotonic() < expires
+
+    def _issue_token(self) -> dict:
+        """Create a new access and refresh token."""
+        access, refresh = secrets.token_hex(8), secrets.token_hex(8)
+        self._tokens[access] = time.monotonic() + self.token_ttl
+        self._refresh_tokens.add(refresh)
+        return {
+            "access_token": access,
+            "token_type": "bearer",
+            "refresh_token": refresh,
+            "expires_in": self.token_ttl,
+        }
+
+    async def _handle_token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        self.requests[f"token:{form.get('grant_type')}"] += 1
+        await self._delay()
+        if self._fail():
+            return web.Response(status=503)
+        if form.get("grant_type") == "refresh_token":
+            if form.get("refresh_token") not in self._refresh_tokens:
+                return web.json_response({"error": "invalid_grant"}, status=400)
+            self._refresh_tokens.discard(form["refresh_token"])
+        return web.json_response(self._issue_token())
+
+    async def _handle_cards(self, request: web.Request) -> web.Response:
+        self.requests["CardNos/three"] += 1
+        await self._delay()
+        if self._fail():
+            return web.Response(status=503)
+        if not self._authorized(request):
+            return web.json_response({"error": "invalid_token"}, status=401)
+        return web.json_response(
+            {
+                "status": 1,
+                "data": [
+                    {
+                        "communityId": cid,
+                        "communityName": f"小区 {cid}",
+                        "doorCommunityId": cid,
+                        "cardNo": f"card{cid}",
+                    }
+                    for cid in self.community_ids(self.communities)
+                ],
+            }
+        )
+
+    async def _handle_doors(self, request: web.Request) -> web.Response:
+        self.requests["getDoors"] += 1
+        body = await request.json()
+        await self._delay()
+        if self._fail():
+            return web.Response(status=503)
+        if not self._authorized(request):
+            return web.json_response({"error": "invalid_token"}, status=401)
+
+        cid = int(body["communityId"])
+        begin, end = int(body["begin"]), min(int(body["end"]), self.doors)
+        suffix = f" ({self.revision})" if self.revision else ""
+        return web.json_response(
+            {
+                "status": 1,
+                "data": {
+                    "total": self.doors,
+                    "dataList": [
+                        {
+                            "msDoorId": cid * 100000 + index,
+                            "msDoorName": f"{cid} 号小区 {index} 号门{suffix}",
+                            "id": index,
+                            "cardno": body["cardNo"],
+                        }
+                        for index in range(begin, end + 1)
+                    ],
+                },
+            }
+        )
+
+    async def _handle_open(self, request: web.Request) -> web.Response:
+        self.requests["openDoor/three"] += 1
+        await request.read()
+        await self._delay()
+        if self._fail():
+            return web.Response(status=503)
+        if not self._authorized(request):
+            return web.json_response({"error": "invalid_token"}, status=401)
+        return web.json_response({"status": 1, "msg": "开门成功"})
+
+    async def _handle_head(self, request: web.Request) -> web.Response:
+        self.requests["keepalive"] += 1
+        return web.Response()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        app = web.Application()
+        app.router.add_post(urlsplit(API_LOGIN).path, self._handle_token)
+        app.router.add_post(urlsplit(API_CARD_NOS).path, self._handle_cards)
+        app.router.add_post(urlsplit(API_GET_DOORS).path, self._handle_doors)
+        app.router.add_post(urlsplit(API_OPEN_DOOR).path, self._handle_open)
+        app.router.add_route("HEAD", "/", self._handle_head)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def endpoints(self) -> dict:
+        """Return the api module attributes that point at this mock."""
+        return {
+            "API_LOGIN": self.base_url + urlsplit(API_LOGIN).path,
+            "API_CARD_NOS": self.base_url + urlsplit(API_CARD_NOS).path,
+            "API_GET_DOORS": self.base_url + urlsplit(API_GET_DOORS).path,
+            "API_OPEN_DOOR": self.base_url + urlsplit(API_OPEN_DOOR).path,
+            "DOOR_HOST_URL": self.base_url + "/",
+        }
+
+    def patch_api(self):
+        """Return a patcher that points the API client at this mock."""
+        from unittest.mock import patch
+
+        return patch.multiple(hilife_api, **self.endpoints())
+
+
+async def _async_main(args: argparse.Namespace) -> None:
+    cloud = MockCloud(
+        communities=args.communities,
+        doors=args.doors,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+        error_rate=args.error_rate,
+        token_ttl=args.token_ttl,
+    )
+    print("Serving HiLife mock cloud on", await cloud.start(args.host, args.port))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await cloud.stop()
+
+
+def main() -> None:
+    """Run the mock cloud from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--communities", type=int, default=1)
+    parser.add_argument("--doors", type=int, default=50, help="doors per community")
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds")
+    parser.add_argument("--jitter", type=float, default=0, help="milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--token-ttl", type=int, default=3600, help="seconds")
+    try:
+        asyncio.run(_async_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
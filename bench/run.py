@@ -0,0 +1,612 @@
+"""Run the HiLife Door benchmarks against the local mock cloud.
+
+Writes machine-readable JSON so runs can be compared between commits::
+
+    python -m bench.run --output before.json
+    python -m bench.compare before.json after.json
+
+The API benchmarks only need aiohttp. The Home Assistant benchmarks
+(setup, polling, memory) need ``pytest-homeassistant-custom-component``
+and are skipped when it is not installed, or with ``--skip-ha``. No
+network access is used.
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from importlib.util import find_spec
+from typing import Optional
+
+import aiohttp
+from yarl import URL
+
+from custom_components.hilife_door import api as hilife_api
+from custom_components.hilife_door import scheduler as hilife_scheduler
+from custom_components.hilife_door.api import HiLifeAsyncApi, json_loads
+from custom_components.hilife_door.const import (
+    DOMAIN,
+    ENDPOINT_GET_DOORS,
+    ENDPOINT_OPEN_DOOR,
+    RATE_LIMITS,
+)
+from custom_components.hilife_door import index as hilife_index
+from custom_components.hilife_door.models import Door
+
+from .mock_cloud import MockCloud
+
+
+def _summary(samples: list) -> dict:
+    """Summarize latencies given in seconds as milliseconds."""
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def pick(quantile: float) -> float:
+        return round(samples[min(len(samples) - 1, int(quantile * len(samples)))] * 1000, 3)
+
+    return {
+        "n": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+async def bench_door_open(cloud: MockCloud, opens: int) -> dict:
+    """Latency of single door opens, cold connection and warm."""
+    async with aiohttp.ClientSession() as session:
+        api = HiLifeAsyncApi(session, "13800000000", "password", "user")
+        await api.login()
+        payload = api.build_open_door_payload(1, "门", 1000)
+
+        start = time.perf_counter()
+        await api.open_door_payload(payload)
+        cold = time.perf_counter() - start
+
+        samples, stages = [], {"queue": [], "request": [], "read": []}
+        for _ in range(opens):
+            start = time.perf_counter()
+            await api.open_door_payload(payload)
+            samples.append(time.perf_counter() - start)
+            for stage, values in stages.items():
+                values.append(api.last_open_timing.get(stage, 0))
+        api.close()
+
+    return {
+        "cold_ms": round(cold * 1000, 3),
+        "warm": _summary(samples),
+        "stages": {stage: _summary(values) for stage, values in stages.items()},
+    }
+
+
+async def bench_multi_open(cloud: MockCloud, doors: int, concurrency: int) -> dict:
+    """Wall time to open ``doors`` doors with bounded concurrency."""
+    async with aiohttp.ClientSession() as session:
+        api = HiLifeAsyncApi(session, "13800000000", "password", "user")
+        await api.login()
+        payloads = [
+            api.build_open_door_payload(index, f"门 {index}", 1000)
+            for index in range(doors)
+        ]
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def open_one(payload):
+            async with semaphore:
+                return await api.open_door_payload(payload)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(open_one(p) for p in payloads))
+        elapsed = time.perf_counter() - start
+        api.close()
+
+    return {
+        "doors": doors,
+        "concurrency": concurrency,
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "succeeded": sum(result.get("status") == 1 for result in results),
+    }
+
+
+async def bench_get_doors(cloud: MockCloud, repeat: int) -> dict:
+    """Cost of fetching a full, paginated door list."""
+    async with aiohttp.ClientSession() as session:
+        api = HiLifeAsyncApi(session, "13800000000", "password", "user")
+        await api.login()
+        before = cloud.requests["getDoors"]
+        samples, count = [], 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = len(await api.get_doors(1000, "card1000"))
+            samples.append(time.perf_counter() - start)
+        api.close()
+
+    return {
+        "doors": count,
+        "requests_per_fetch": (cloud.requests["getDoors"] - before) / repeat,
+        "latency": _summary(samples),
+    }
+
+
+def _unlimited():
+    """Return a patcher that lifts the client's rate limits.
+
+    The other benchmarks measure the client and the integration, not how
+    long the rate limiter makes a burst of requests wait.
+    """
+    from unittest.mock import patch
+
+    return patch.multiple(
+        hilife_scheduler,
+        RATE_LIMITS={endpoint: (1e9, 1e9) for endpoint in RATE_LIMITS},
+        RATE_LIMIT_ACCOUNT=(1e9, 1e9),
+    )
+
+
+async def bench_scheduler(polls: int) -> dict:
+    """How long a door open waits behind a backlog of door list polls.
+
+    Queues ``polls`` getDoors requests, more than their burst allows,
+    then asks for an openDoor slot. Nothing is sent.
+    """
+    scheduler = hilife_scheduler.RequestScheduler()
+    start = time.perf_counter()
+    backlog = [
+        asyncio.ensure_future(scheduler.acquire(ENDPOINT_GET_DOORS))
+        for _ in range(polls)
+    ]
+    await asyncio.sleep(0)
+    open_wait = await scheduler.acquire(ENDPOINT_OPEN_DOOR)
+    poll_waits = await asyncio.gather(*backlog)
+    elapsed = time.perf_counter() - start
+    scheduler.close()
+    return {
+        "polls": polls,
+        "open_wait_ms": round(open_wait * 1000, 3),
+        "poll_wait": _summary(poll_waits),
+        "backlog_ms": round(elapsed * 1000, 3),
+        "queues": scheduler.as_dict(),
+    }
+
+
+def _retained_bytes(build) -> int:
+    """Return the memory still held by what ``build()`` returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        del kept
+        return retained
+    finally:
+        tracemalloc.stop()
+
+
+def bench_door_records(doors: list) -> dict:
+    """Memory per door as a shared ``Door`` record and as a plain dict.
+
+    Both copies reference the same strings, so this is the overhead of
+    the container alone.
+    """
+    records = _retained_bytes(lambda: [Door(**door.as_dict()) for door in doors])
+    dicts = _retained_bytes(lambda: [door.as_dict() for door in doors])
+    return {
+        "doors": len(doors),
+        "bytes_per_record": round(records / len(doors)),
+        "bytes_per_dict": round(dicts / len(doors)),
+    }
+
+
+def bench_overhead(rows: int, number: int) -> dict:
+    """Per-call CPU cost of building requests and parsing door pages.
+
+    ``legacy`` rebuilds, serializes and signs every request the way the
+    client used to; ``current`` is what the client does now. No request
+    is sent.
+    """
+    api = HiLifeAsyncApi(None, "13800000000", "password", "user")
+    token = "a" * 32
+    request = api.build_open_door_payload(1, "1 号门", 1000, 1000, "card1000")
+
+    def legacy_open():
+        payload = {
+            "doorName": "1 号门",
+            "doorCommunityId": str(1000),
+            "communityId": str(1000),
+            "doorId": 1,
+            "cardNo": "card1000",
+            "userId": api.user_id,
+            "isScan": 2,
+        }
+        return URL(f"{hilife_api.API_OPEN_DOOR}?access_token={token}"), json.dumps(
+            payload
+        ).encode()
+
+    def current_open():
+        return api._signed_url(hilife_api.API_OPEN_DOOR, token), request.body
+
+    page = json.dumps(
+        {
+            "status": 1,
+            "data": {
+                "total": rows,
+                "dataList": [
+                    {
+                        "msDoorId": 100000 + index,
+                        "msDoorName": f"1000 号小区 {index} 号门",
+                        "id": index,
+                        "cardno": "card1000",
+                    }
+                    for index in range(rows)
+                ],
+            },
+        },
+        ensure_ascii=False,
+    ).encode()
+
+    def per_call(function) -> float:
+        best = min(timeit.repeat(function, number=number, repeat=5))
+        return round(best / number * 1e6, 3)
+
+    return {
+        "json_backend": "orjson" if hilife_api.orjson is not None else "json",
+        "open_request_us": {
+            "legacy": per_call(legacy_open),
+            "current": per_call(current_open),
+        },
+        "door_page_parse_us": {
+            "rows": rows,
+            "legacy": per_call(lambda: json.loads(page)),
+            "current": per_call(lambda: json_loads(page)),
+        },
+    }
+
+
+def bench_door_index(doors: list) -> dict:
+    """Cost of indexing a door list and of resolving a door by name."""
+    # Import pypinyin before timing, it only happens once per process
+    hilife_index.pinyin_forms(doors[0].name)
+    index = hilife_index.DoorIndex()
+    start = time.perf_counter()
+    index.update("bench", {door.id: door for door in doors})
+    build = time.perf_counter() - start
+
+    names = [door.name for door in doors]
+    start = time.perf_counter()
+    for name in names:
+        index.resolve(name)
+    resolve = (time.perf_counter() - start) / len(names)
+    return {
+        "build_ms": round(build * 1000, 3),
+        "resolve_us": round(resolve * 1e6, 3),
+    }
+
+
+@contextlib.asynccontextmanager
+async def _async_hass(storage_dir: str):
+    """Yield a test Home Assistant instance that loads this integration."""
+    from homeassistant import loader
+    from pytest_homeassistant_custom_component.common import (
+        async_test_home_assistant,
+    )
+
+    context = async_test_home_assistant(storage_dir=storage_dir)
+    if hasattr(context, "__aenter__"):
+        async with context as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            yield hass
+            await hass.async_stop(force=True)
+    else:
+        hass = await context
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+        try:
+            yield hass
+        finally:
+            await hass.async_stop(force=True)
+
+
+def _entry(community_id: int):
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title=f"HiLife - 小区 {community_id}",
+        data={
+            "phone": "13800000000",
+            "password": "password",
+            "user_id": "user",
+            "community_id": community_id,
+            "community_name": f"小区 {community_id}",
+            "door_community_id": community_id,
+            "card_no": f"card{community_id}",
+        },
+    )
+
+
+async def _async_wait_for_doors(hass, entry) -> None:
+    """Wait until the entry's door entities exist.
+
+    Setup returns before the first door list is fetched when there is no
+    cache, so the entities show up in the background.
+    """
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    while not coordinator.data:
+        await asyncio.sleep(0.01)
+    await hass.async_block_till_done()
+
+
+async def _async_bench_webhook(hass, entry, opens: int) -> dict:
+    """Time the webhook adds on top of the door open it makes."""
+    from aiohttp.streams import EmptyStreamReader
+    from aiohttp.test_utils import make_mocked_request
+    from homeassistant.components import webhook
+
+    from custom_components.hilife_door.const import (
+        CONF_WEBHOOK_ID,
+        CONF_WEBHOOK_SECRET,
+        WEBHOOK_SECRET_HEADER,
+    )
+
+    webhook_id = entry.data[CONF_WEBHOOK_ID]
+    door_id = next(iter(hass.data[DOMAIN][entry.entry_id]["entities"]))
+    samples, overhead = [], []
+    for _ in range(opens):
+        request = make_mocked_request(
+            "POST",
+            f"/api/webhook/{webhook_id}?door_id={door_id}",
+            headers={WEBHOOK_SECRET_HEADER: entry.data[CONF_WEBHOOK_SECRET]},
+            payload=EmptyStreamReader(),
+        )
+        start = time.perf_counter()
+        response = await webhook.async_handle_webhook(hass, webhook_id, request)
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed)
+        overhead.append(elapsed - json.loads(response.body)["elapsed_ms"] / 1000)
+    return {"latency": _summary(samples), "overhead": _summary(overhead)}
+
+
+async def bench_home_assistant(cloud: MockCloud, entries: int, polls: int) -> dict:
+    """Setup time, poll cost and memory per entity inside Home Assistant."""
+    results = {}
+    with tempfile.TemporaryDirectory() as storage_dir:
+        async with _async_hass(storage_dir) as hass:
+            # Cold setup: empty cache, login and door list from the cloud
+            entry = _entry(MockCloud.community_ids(1)[0])
+            entry.add_to_hass(hass)
+            gc.collect()
+            tracemalloc.start()
+            before = tracemalloc.take_snapshot()
+            start = time.perf_counter()
+            await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            results["setup_cold_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            await _async_wait_for_doors(hass, entry)
+            results["doors_ready_cold_ms"] = round(
+                (time.perf_counter() - start) * 1000, 3
+            )
+            after = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            doors = len(hass.states.async_entity_ids("lock"))
+            allocated = sum(
+                stat.size_diff for stat in after.compare_to(before, "filename")
+            )
+            results["memory"] = {
+                "entities": doors,
+                "bytes_per_entity": round(allocated / doors) if doors else None,
+            }
+
+            # Warm setup: entities come from the on-disk cache
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+            start = time.perf_counter()
+            await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            results["setup_cached_ms"] = round(
+                (time.perf_counter() - start) * 1000, 3
+            )
+
+            # Poll cost with several entries on the same account
+            for community_id in MockCloud.community_ids(entries)[1:]:
+                other = _entry(community_id)
+                other.add_to_hass(hass)
+                await hass.config_entries.async_setup(other.entry_id)
+                await _async_wait_for_doors(hass, other)
+
+            coordinators = [
+                data["coordinator"]
+                for key, data in hass.data[DOMAIN].items()
+                if isinstance(data, dict) and "coordinator" in data
+            ]
+            before = sum(cloud.requests.values())
+            samples = []
+            for _ in range(polls):
+                start = time.perf_counter()
+                await asyncio.gather(*(c.async_refresh() for c in coordinators))
+                await hass.async_block_till_done()
+                samples.append(time.perf_counter() - start)
+            results["poll"] = {
+                "entries": len(coordinators),
+                "requests_per_cycle": (sum(cloud.requests.values()) - before) / polls,
+                "cycle": _summary(samples),
+            }
+            results["logins"] = cloud.requests["token:multiple"]
+            results["webhook"] = await _async_bench_webhook(hass, entry, polls * 10)
+
+    return results
+
+
+async def bench_fleet(
+    cloud: MockCloud, doors: int, repeat: int, skip_ha: Optional[str]
+) -> dict:
+    """Door record memory, index and refresh cost for a large account.
+
+    Runs without simulated latency so the refresh times are the cost of
+    parsing the list and updating the entities.
+    """
+    saved = cloud.doors, cloud.latency, cloud.jitter
+    cloud.doors, cloud.latency, cloud.jitter = doors, 0, 0
+    community_id = MockCloud.community_ids(1)[0]
+    try:
+        async with aiohttp.ClientSession() as session:
+            api = HiLifeAsyncApi(session, "13800000000", "password", "user")
+            await api.login()
+            records = await api.get_doors(community_id, f"card{community_id}")
+            api.close()
+        results = {
+            "memory": bench_door_records(records),
+            "index": (
+                bench_door_index(records)
+                if find_spec("pypinyin") is not None
+                else {"skipped": "pypinyin is not installed"}
+            ),
+        }
+
+        if skip_ha:
+            results["refresh"] = {"skipped": skip_ha}
+            return results
+
+        with tempfile.TemporaryDirectory() as storage_dir:
+            async with _async_hass(storage_dir) as hass:
+                entry = _entry(community_id)
+                entry.add_to_hass(hass)
+                await hass.config_entries.async_setup(entry.entry_id)
+                await _async_wait_for_doors(hass, entry)
+                coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+                async def refresh(change: bool) -> list:
+                    samples = []
+                    for _ in range(repeat):
+                        if change:
+                            cloud.revision += 1
+                        start = time.perf_counter()
+                        await coordinator.async_refresh()
+                        await hass.async_block_till_done()
+                        samples.append(time.perf_counter() - start)
+                    return samples
+
+                results["refresh"] = {
+                    "entities": len(hass.states.async_entity_ids("lock")),
+                    "unchanged": _summary(await refresh(False)),
+                    "changed": _summary(await refresh(True)),
+                }
+    finally:
+        cloud.doors, cloud.latency, cloud.jitter = saved
+        cloud.revision = 0
+
+    return results
+
+
+def _ha_skip_reason(args: argparse.Namespace) -> Optional[str]:
+    """Return why the Home Assistant benchmarks are skipped, if they are."""
+    if args.skip_ha:
+        return "disabled"
+    for module in ("homeassistant", "pytest_homeassistant_custom_component"):
+        if find_spec(module) is None:
+            return f"{module} is not installed"
+    return None
+
+
+def _git_revision() -> str:
+    """Return the current commit, if this is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def async_run(args: argparse.Namespace) -> dict:
+    """Run every benchmark and return the results."""
+    skip_ha = _ha_skip_reason(args)
+    cloud = MockCloud(
+        communities=max(args.entries, 1),
+        doors=args.doors,
+        latency=args.latency / 1000,
+        jitter=args.jitter / 1000,
+    )
+    await cloud.start()
+    results = {
+        "overhead": bench_overhead(args.page_rows, args.overhead_calls),
+        "scheduler": await bench_scheduler(args.backlog),
+    }
+    try:
+        with cloud.patch_api(), _unlimited():
+            results["door_open"] = await bench_door_open(cloud, args.opens)
+            results["multi_open"] = await bench_multi_open(
+                cloud, args.multi_doors, args.concurrency
+            )
+            results["get_doors"] = await bench_get_doors(cloud, args.repeat)
+            results["fleet"] = await bench_fleet(
+                cloud, args.fleet_doors, args.repeat, skip_ha
+            )
+            if skip_ha:
+                results["home_assistant"] = {"skipped": skip_ha}
+            else:
+                results["home_assistant"] = await bench_home_assistant(
+                    cloud, args.entries, args.repeat
+                )
+    finally:
+        await cloud.stop()
+
+    return {
+        "meta": {
+            "revision": _git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "aiohttp": aiohttp.__version__,
+            "platform": platform.platform(),
+            "params": vars(args) | {"output": None},
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--doors", type=int, default=250, help="doors per community")
+    parser.add_argument("--entries", type=int, default=3, help="config entries")
+    parser.add_argument("--opens", type=int, default=50)
+    parser.add_argument("--multi-doors", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--backlog", type=int, default=40, help="queued polls")
+    parser.add_argument("--page-rows", type=int, default=100)
+    parser.add_argument("--overhead-calls", type=int, default=2000)
+    parser.add_argument(
+        "--fleet-doors", type=int, default=1200, help="doors of the large account"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=20, help="milliseconds")
+    parser.add_argument("--jitter", type=float, default=5, help="milliseconds")
+    parser.add_argument(
+        "--skip-ha", action="store_true", help="only run the API benchmarks"
+    )
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(async_run(args)), indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""Command line for bulk HiLife cloud operations, without Home Assistant.
+
+    python -m hilife_door doors accounts.csv --concurrency 16 > doors.ndjson
+
+Reads accounts, as CSV with a ``phone,password,user_id`` header or as
+JSON lines with those keys, from a file or stdin. Every account runs on a
+pool of async workers, optionally spread over several processes, and the
+results are written as one JSON object per line as soon as they arrive.
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Awaitable, Callable, Iterator, Optional, Union
+
+import aiohttp
+
+from .api import HiLifeApiError, HiLifeAsyncApi, json_dumps, json_loads
+from .const import DEFAULT_PAGE_SIZE, PAGE_CONCURRENCY
+
+_LOGGER = logging.getLogger(__name__)
+
+COMMANDS = ("check", "communities", "doors")
+ACCOUNT_FIELDS = ("phone", "password", "user_id")
+
+# Output lines a worker process may queue before it waits for the writer
+PROCESS_QUEUE_SIZE = 1000
+# Seconds a worker process sleeps while its output queue is full
+PROCESS_QUEUE_POLL = 0.05
+
+
+def read_accounts(stream) -> Iterator[Union[dict, ValueError]]:
+    """Yield the accounts of a CSV or JSON lines stream, one at a time.
+
+    A JSON line that is not an object is yielded as a ValueError, so it
+    is reported like any other failed account.
+    """
+    first = stream.readline()
+    while first and not first.strip():
+        first = stream.readline()
+    if not first:
+        return
+
+    lines = itertools.chain([first], stream)
+    if first.lstrip().startswith("{"):
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                account = json_loads(line)
+            except ValueError as err:
+                yield ValueError(f"line {number}: {err}")
+                continue
+            if isinstance(account, dict):
+                yield account
+            else:
+                yield ValueError(f"line {number}: not a JSON object")
+    else:
+        yield from csv.DictReader(lines)
+
+
+def _error(account: str, err: Exception, **extra) -> dict:
+    """Return the output record of a failed operation."""
+    return {
+        "account": account,
+        **extra,
+        "error": type(err).__name__,
+        "message": str(err),
+    }
+
+
+async def async_run_account(
+    session: aiohttp.ClientSession,
+    command: str,
+    account: Union[dict, ValueError],
+    emit: Callable[[dict], None],
+    page_size: int = DEFAULT_PAGE_SIZE,
+) -> int:
+    """Run ``command`` for one account and return the number of errors.
+
+    ``check`` emits one summary per account, ``communities`` one record
+    per community and ``doors`` one record per door. An unreadable
+    account line from ``read_accounts`` is emitted as an error.
+    """
+    if isinstance(account, ValueError):
+        emit(_error(None, account))
+        return 1
+
+    phone = account.get("phone")
+    missing = [field for field in ACCOUNT_FIELDS if not account.get(field)]
+    if missing:
+        emit(_error(phone, ValueError(f"missing {', '.join(missing)}")))
+        return 1
+
+    api = HiLifeAsyncApi(session, phone, account["password"], account["user_id"])
+    errors = 0
+    door_count = 0
+    stages = {}
+    start = time.monotonic()
+    try:
+        await api.authenticate()
+        stages["login"] = time.monotonic() - start
+        communities = await api.fetch_communities()
+        stages["communities"] = time.monotonic() - start - stages["login"]
+
+        if command == "communities":
+            for community in communities:
+                emit({"account": phone, **community.as_dict()})
+            return 0
+
+        for community in communities:
+            try:
+                doors = await api.fetch_doors(
+                    community.id, community.card_no, page_size
+                )
+            except HiLifeApiError as err:
+                errors += 1
+                emit(_error(phone, err, community_id=community.id))
+                continue
+            door_count += len(doors)
+            if command == "doors":
+                for door in doors:
+                    emit(
+                        {
+                            "account": phone,
+                            "community_name": community.name,
+                            **door.as_dict(),
+                        }
+                    )
+        stages["doors"] = time.monotonic() - start - sum(stages.values())
+
+        if command == "check":
+            emit(
+                {
+                    "account": phone,
+                    "ok": not errors,
+                    "communities": len(communities),
+                    "doors": door_count,
+                    "elapsed_ms": {
+                        stage: round(seconds * 1000, 1)
+                        for stage, seconds in stages.items()
+                    },
+                }
+            )
+        return errors
+
+    except HiLifeApiError as err:
+        emit(_error(phone, err))
+        return errors + 1
+
+    except Exception as err:
+        # A bug or an unexpected response must not stop the other accounts
+        _LOGGER.debug("Unexpected error for %s", phone, exc_info=True)
+        emit(_error(phone, err))
+        return errors + 1
+
+    finally:
+        api.close()
+
+
+async def async_run_pool(
+    command: str,
+    accounts: Iterator[Union[dict, ValueError]],
+    emit: Callable[[dict], None],
+    concurrency: int,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    ready: Optional[Callable[[], Awaitable[None]]] = None,
+) -> dict:
+    """Run ``command`` for every account, ``concurrency`` at a time.
+
+    The workers pull accounts from the shared iterator as they free up,
+    so neither the accounts nor the results pile up in memory. When
+    given, ``ready`` is awaited before each account to hold the workers
+    back while the output is not being consumed.
+    """
+    counts = {"accounts": 0, "errors": 0}
+    connector = aiohttp.TCPConnector(limit=concurrency * PAGE_CONCURRENCY)
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def worker() -> None:
+            for account in accounts:
+                if ready is not None:
+                    await ready()
+                counts["accounts"] += 1
+                errors = await async_run_account(
+                    session, command, account, emit, page_size
+                )
+                counts["errors"] += errors
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return counts
+
+
+def _process_main(args: argparse.Namespace, shard: int, results) -> None:
+    """Run every ``args.processes``-th account in a worker process.
+
+    Putting on ``results`` blocks while the queue is full, so a thread
+    forwards the output there and the event loop never waits on it.
+    """
+    pending = queue.SimpleQueue()
+
+    def forward() -> None:
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            results.put(item)
+
+    async def ready() -> None:
+        while pending.qsize() >= PROCESS_QUEUE_SIZE:
+            await asyncio.sleep(PROCESS_QUEUE_POLL)
+
+    forwarder = threading.Thread(target=forward, daemon=True)
+    forwarder.start()
+    try:
+        with open(args.accounts, newline="", encoding="utf-8") as stream:
+            accounts = itertools.islice(
+                read_accounts(stream), shard, None, args.processes
+            )
+            counts = asyncio.run(
+                async_run_pool(
+                    args.command,
+                    accounts,
+                    lambda record: pending.put(json_dumps(record)),
+                    args.concurrency,
+                    args.page_size,
+                    ready,
+                )
+            )
+        pending.put(counts)
+    finally:
+        pending.put(None)
+        forwarder.join()
+
+
+def _run_processes(args: argparse.Namespace, write: Callable[[bytes], None]) -> dict:
+    """Shard the accounts over worker processes and write their output."""
+    results = multiprocessing.Queue(PROCESS_QUEUE_SIZE)
+    processes = [
+        multiprocessing.Process(
+            target=_process_main, args=(args, shard, results), daemon=True
+        )
+        for shard in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+
+    counts = {"accounts": 0, "errors": 0}
+    done = 0
+    while done < len(processes):
+        try:
+            item = results.get(timeout=1)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+        if isinstance(item, bytes):
+            write(item)
+        else:
+            done += 1
+            for key, value in item.items():
+                counts[key] += value
+
+    for process in processes:
+        process.join()
+    if done < len(processes):
+        _LOGGER.error("%d worker processes failed", len(processes) - done)
+        counts["errors"] += len(processes) - done
+    return counts
+
+
+def main(argv=None) -> int:
+    """Run the command line and return the exit code."""
+    parser = argparse.ArgumentParser(
+        prog="python -m hilife_door",
+        description="Run HiLife cloud operations for many accounts at once "
+        "and write the results as JSON lines.",
+    )
+    parser.add_argument(
+        "command",
+        choices=COMMANDS,
+        help="check: log in and count doors; communities: list communities; "
+        "doors: list every door",
+    )
+    parser.add_argument(
+        "accounts",
+        nargs="?",
+        default="-",
+        help="CSV or JSON lines file of phone, password and user_id "
+        "(default: stdin)",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="accounts run at once per process"
+    )
+    parser.add_argument(
+        "--processes", type=int, default=1, help="worker processes (needs a file)"
+    )
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.concurrency < 1 or args.processes < 1:
+        parser.error("--concurrency and --processes must be at least 1")
+    if args.processes > 1 and args.accounts == "-":
+        parser.error("--processes needs an accounts file")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+
+    def write(line: bytes) -> None:
+        output.write(line + b"\n")
+        output.flush()
+
+    start = time.monotonic()
+    try:
+        if args.processes > 1:
+            counts = _run_processes(args, write)
+        elif args.accounts == "-":
+            counts = asyncio.run(
+                async_run_pool(
+                    args.command,
+                    read_accounts(sys.stdin),
+                    lambda record: write(json_dumps(record)),
+                    args.concurrency,
+                    args.page_size,
+                )
+            )
+        else:
+            with open(args.accounts, newline="", encoding="utf-8") as stream:
+                counts = asyncio.run(
+                    async_run_pool(
+                        args.command,
+                        read_accounts(stream),
+                        lambda record: write(json_dumps(record)),
+                        args.concurrency,
+                        args.page_size,
+                    )
+                )
+    except BrokenPipeError:
+        # The reader went away, e.g. ``| head``; silence the final flush
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if output is not sys.stdout.buffer:
+            output.close()
+
+    print(
+        f"{counts['accounts']} accounts, {counts['errors']} errors "
+        f"in {time.monotonic() - start:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if counts["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
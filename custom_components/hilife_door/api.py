@@ -1,8 +1,20 @@
 """HiLife Door API Client."""
+import asyncio
 import base64
+import hashlib
+import json
 import logging
-import requests
+import time
 from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from yarl import URL
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .const import (
     API_LOGIN,
@@ -10,176 +22,674 @@ from .const import (
     API_GET_DOORS,
     API_OPEN_DOOR,
     AUTH_CLIENT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DOOR_HOST_URL,
+    DOOR_TOTAL_KEYS,
+    ENDPOINT_CARD_NOS,
+    ENDPOINT_GET_DOORS,
+    ENDPOINT_LOGIN,
+    ENDPOINT_OPEN_DOOR,
+    ENDPOINTS,
+    KEEPALIVE_WINDOW,
+    MAX_DOOR_PAGES,
+    PAGE_CONCURRENCY,
+    TOKEN_INVALID_STATUSES,
+)
+from .auth import TokenManager
+from .metrics import ApiMetrics
+from .models import Community, Door, OpenDoorRequest
+from .resilience import (
+    OPEN_RETRY,
+    READ_RETRY,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    async_call_with_retry,
 )
+from .scheduler import RequestScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
+# Errors of the transport rather than of the cloud
+CONNECTION_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError, CircuitOpenError)
+
+# Errors of reading a body that is not JSON or not shaped as expected
+MALFORMED_ERRORS = (ValueError, AttributeError, TypeError)
+
+
+def _door_ids(rows: list) -> set:
+    """Return the ``msDoorId`` of the raw door rows of a page."""
+    return {row.get("msDoorId") for row in rows if isinstance(row, dict)}
+
+
+def json_dumps(data) -> bytes:
+    """Serialize ``data`` to compact UTF-8 JSON, with orjson if installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def json_loads(raw: bytes):
+    """Parse a JSON body, with orjson if installed; empty bodies are None."""
+    if not raw.strip():
+        return None
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 
 class HiLifeApiError(Exception):
     """HiLife API Error."""
     pass
 
 
-class HiLifeApi:
-    """HiLife Door API Client."""
+class HiLifeAuthError(HiLifeApiError):
+    """The cloud rejected the account's credentials or token."""
 
-    def __init__(self, phone: str, password: str, user_id: str):
+
+class HiLifeConnectionError(HiLifeApiError):
+    """The cloud could not be reached."""
+
+
+class HiLifeResponseError(HiLifeApiError):
+    """The cloud answered a request with an error status."""
+
+    def __init__(self, endpoint: str, status, msg=None):
+        """Initialize the error."""
+        super().__init__(f"{endpoint} failed: {status} {msg}")
+        self.endpoint = endpoint
+        self.status = status
+        self.msg = msg
+
+
+class HiLifeAsyncApi:
+    """Async HiLife Door API Client.
+
+    Runs on a caller-supplied aiohttp session so Home Assistant can share
+    its pooled keep-alive connections with every request. Every request,
+    retries included, goes through the account's rate limiting scheduler.
+
+    The ``authenticate`` and ``fetch_*`` methods return typed records and
+    raise HiLifeApiError subclasses. The older methods used by Home
+    Assistant log errors and return ``False``, ``[]`` or a failed status.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        phone: str,
+        password: str,
+        user_id: str,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ):
         """Initialize the API client."""
         self.phone = phone
         self.password = password
         self.user_id = user_id
-        self.access_token: Optional[str] = None
-        self._session = requests.Session()
-        self._session.verify = False
+        self._session = session
+        self._timeout = aiohttp.ClientTimeout(
+            connect=connect_timeout, sock_read=read_timeout
+        )
+        self.breakers = {
+            host: CircuitBreaker(host)
+            for host in (urlsplit(API_LOGIN).netloc, urlsplit(API_OPEN_DOOR).netloc)
+        }
+        self._basic_auth = "Basic " + base64.b64encode(
+            AUTH_CLIENT.encode()
+        ).decode()
+        self._tokens = TokenManager(self._password_grant, self._refresh_grant)
+        self._login_error: Optional[HiLifeApiError] = None
+        self._last_activity: Optional[float] = None
+        self._keepalive_interval = 0.0
+        self._keepalive_handle: Optional[asyncio.TimerHandle] = None
+        self._keepalive_task: Optional[asyncio.Task] = None
+        self.last_open_timing: dict = {}
+        self.metrics = ApiMetrics(ENDPOINTS)
+        self.scheduler = RequestScheduler()
+        # (community_id, card_no) -> begin -> memo of the last door page
+        self._door_pages: dict = {}
+        # (community_id, card_no) -> (page digests, the door list built
+        # from those pages)
+        self._door_lists: dict = {}
+        # (community_id, card_no) -> the fields of getDoors that never change
+        self._door_queries: dict = {}
+        # url -> (token, parsed url with the token), rebuilt on a new token
+        self._signed_urls: dict = {}
 
-    def login(self) -> bool:
+    @property
+    def access_token(self) -> Optional[str]:
+        """Return the current access token."""
+        return self._tokens.access_token
+
+    @property
+    def tokens(self) -> TokenManager:
+        """Return the token manager."""
+        return self._tokens
+
+    async def login(self) -> bool:
         """Login and get access token."""
-        try:
-            auth = base64.b64encode(AUTH_CLIENT.encode()).decode()
-            
-            resp = self._session.post(
+        return await self._tokens.async_login()
+
+    async def authenticate(self) -> None:
+        """Log in, raising HiLifeAuthError or HiLifeConnectionError."""
+        if not await self.login():
+            raise self._login_error or HiLifeAuthError("登录失败")
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        """Return the circuit breaker of the host serving ``url``."""
+        host = urlsplit(url).netloc
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = self.breakers[host] = CircuitBreaker(host)
+        return breaker
+
+    async def _token_request(self, data: dict) -> Optional[dict]:
+        """Call the OAuth token endpoint and return the token response."""
+
+        async def send():
+            await self.scheduler.acquire(ENDPOINT_LOGIN)
+            async with self._session.post(
                 API_LOGIN,
                 headers={
-                    "Authorization": f"Basic {auth}",
+                    "Authorization": self._basic_auth,
                     "Content-Type": "application/x-www-form-urlencoded"
                 },
-                data={
-                    "grant_type": "multiple",
-                    "username": self.phone,
-                    "password": self.password
-                },
-                timeout=15
-            )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                self.access_token = data.get("access_token")
-                if self.access_token:
-                    _LOGGER.debug("Login successful")
-                    return True
-            
-            _LOGGER.error("Login failed: %s", resp.text)
-            return False
-            
+                data=data,
+                timeout=self._timeout,
+                ssl=False,
+            ) as resp:
+                if resp.status == 200:
+                    return resp.status, json_loads(await resp.read())
+                return resp.status, await resp.text()
+
+        start = time.monotonic()
+        try:
+            status, token = await async_call_with_retry(
+                self._breaker(API_LOGIN), READ_RETRY, send
+            )
+            if status == 200 and token.get("access_token"):
+                _LOGGER.debug("Login successful")
+                self.metrics.record(ENDPOINT_LOGIN, time.monotonic() - start, 1)
+                self._login_error = None
+                return token
+
+            _LOGGER.error("Login failed: %s", token)
+            if status in (200, 400, 401):
+                self._login_error = HiLifeAuthError(f"Login failed: HTTP {status}")
+            else:
+                self._login_error = HiLifeResponseError(
+                    ENDPOINT_LOGIN, status, f"HTTP {status}"
+                )
+            self.metrics.record(
+                ENDPOINT_LOGIN, time.monotonic() - start, status, f"HTTP {status}"
+            )
+            return None
+
         except Exception as e:
             _LOGGER.error("Login error: %s", e)
+            self._login_error = HiLifeConnectionError(str(e) or type(e).__name__)
+            self.metrics.record(
+                ENDPOINT_LOGIN, time.monotonic() - start, -1, type(e).__name__
+            )
+            return None
+
+    async def _password_grant(self) -> Optional[dict]:
+        """Request a token with phone and password."""
+        return await self._token_request(
+            {
+                "grant_type": "multiple",
+                "username": self.phone,
+                "password": self.password
+            }
+        )
+
+    async def _refresh_grant(self, refresh_token: str) -> Optional[dict]:
+        """Request a token with the refresh token."""
+        return await self._token_request(
+            {
+                "grant_type": "refresh_token",
+                "refresh_token": refresh_token,
+            }
+        )
+
+    @staticmethod
+    def _outcome(status: int, data) -> tuple:
+        """Return the (status, msg) a response is recorded under."""
+        if status == 200 and isinstance(data, dict):
+            return data.get("status"), data.get("msg")
+        return status, f"HTTP {status}"
+
+    @staticmethod
+    def _is_auth_failure(status: int, data) -> bool:
+        """Return True if a response means the access token was rejected."""
+        if status == 401:
+            return True
+        if not isinstance(data, dict):
             return False
+        return (
+            data.get("error") == "invalid_token"
+            or data.get("status") in TOKEN_INVALID_STATUSES
+        )
 
-    def get_communities(self) -> list:
+    async def _post_json(
+        self,
+        endpoint: str,
+        url: str,
+        payload,
+        headers: dict,
+        timing: dict = None,
+        retry: RetryPolicy = READ_RETRY,
+        memo: dict = None,
+    ):
+        """POST a JSON body with the access token, return (status, body).
+
+        ``payload`` is a dict or an already serialized body. If the server
+        rejects the token the request is replayed once with a renewed
+        token. Raises HiLifeApiError when no token is available. See
+        ``_decode`` for ``memo``.
+        """
+        if not isinstance(payload, bytes):
+            payload = json_dumps(payload)
+        start = time.monotonic()
+        token = await self._tokens.async_get_token()
+        if not token:
+            raise HiLifeAuthError("登录失败")
+        if timing is not None:
+            timing["queue"] = time.monotonic() - start
+
+        status, data = await self._post(
+            endpoint, url, token, payload, headers, timing, retry, memo
+        )
+        if self._is_auth_failure(status, data):
+            self._tokens.invalidate(token)
+            token = await self._tokens.async_get_token()
+            if not token:
+                raise HiLifeAuthError("登录失败")
+            status, data = await self._post(
+                endpoint, url, token, payload, headers, timing, retry, memo
+            )
+        return status, data
+
+    def _signed_url(self, url: str, token: str) -> URL:
+        """Return ``url`` with the access token, parsed once per token."""
+        signed = self._signed_urls.get(url)
+        if signed is None or signed[0] != token:
+            signed = self._signed_urls[url] = (
+                token,
+                URL(f"{url}?access_token={token}"),
+            )
+        return signed[1]
+
+    async def _post(
+        self,
+        endpoint: str,
+        url: str,
+        token: str,
+        payload: bytes,
+        headers: dict,
+        timing: dict = None,
+        retry: RetryPolicy = READ_RETRY,
+        memo: dict = None,
+    ):
+        """Send one authenticated POST, retried per ``retry``."""
+        if memo is not None and memo.get("etag"):
+            headers = {**headers, "If-None-Match": memo["etag"]}
+        signed_url = self._signed_url(url, token)
+
+        async def send():
+            waited = await self.scheduler.acquire(endpoint)
+            start = time.monotonic()
+            async with self._session.post(
+                signed_url,
+                headers=headers,
+                data=payload,
+                timeout=self._timeout,
+                ssl=False,
+            ) as resp:
+                received = time.monotonic()
+                status = resp.status
+                if status == 304 and memo is not None and "data" in memo:
+                    status, body = 200, memo["data"]
+                elif status == 200 and memo is not None:
+                    body = self._decode(
+                        await resp.read(), resp.headers.get("ETag"), memo
+                    )
+                elif status == 200:
+                    body = json_loads(await resp.read())
+                else:
+                    body = await resp.text()
+                self._last_activity = time.monotonic()
+
+            if timing is not None:
+                timing["queue"] = timing.get("queue", 0) + waited
+                timing["request"] = received - start
+                timing["read"] = self._last_activity - received
+            return status, body
+
+        return await async_call_with_retry(self._breaker(url), retry, send)
+
+    def close(self) -> None:
+        """Stop background token refreshes and keep-alives."""
+        self._tokens.close()
+        self.scheduler.close()
+        self._stop_keepalive()
+        if self._keepalive_task is not None and not self._keepalive_task.done():
+            self._keepalive_task.cancel()
+
+    @staticmethod
+    def _decode(raw: bytes, etag: Optional[str], memo: dict):
+        """Parse a JSON body unless it is byte-identical to the last one.
+
+        ``memo`` keeps the digest, ETag and parsed body of the previous
+        response to the same request. An unchanged body returns the
+        previous object without parsing.
+        """
+        digest = hashlib.blake2b(raw, digest_size=16).digest()
+        if memo.get("digest") == digest:
+            return memo["data"]
+
+        data = json_loads(raw)
+        memo.update(digest=digest, etag=etag, data=data)
+        return data
+
+    async def fetch_communities(self) -> list:
+        """Return the ``Community`` records of the account's cards.
+
+        Raises HiLifeApiError, or a subclass of it, on failure.
+        """
+        start = time.monotonic()
+        try:
+            status, data = await self._post_json(
+                ENDPOINT_CARD_NOS,
+                API_CARD_NOS,
+                {"userId": self.user_id},
+                {"Content-Type": "application/json"},
+            )
+        except Exception as e:
+            self.metrics.record(
+                ENDPOINT_CARD_NOS, time.monotonic() - start, -1, type(e).__name__
+            )
+            if isinstance(e, CONNECTION_ERRORS):
+                raise HiLifeConnectionError(str(e) or type(e).__name__) from e
+            if isinstance(e, ValueError):
+                raise HiLifeResponseError(ENDPOINT_CARD_NOS, 200, "invalid JSON") from e
+            raise
+        outcome = self._outcome(status, data)
+        self.metrics.record(ENDPOINT_CARD_NOS, time.monotonic() - start, *outcome)
+
+        if status != 200 or outcome[0] != 1:
+            raise HiLifeResponseError(ENDPOINT_CARD_NOS, *outcome)
+
+        # Extract unique communities
+        communities = {}
+        try:
+            for card in data.get("data") or []:
+                cid = card.get("communityId")
+                if cid and cid not in communities:
+                    communities[cid] = Community(
+                        cid,
+                        card.get("communityName", f"小区 {cid}"),
+                        card.get("doorCommunityId", cid),
+                        card.get("cardNo", self.phone),
+                    )
+        except MALFORMED_ERRORS as e:
+            raise HiLifeResponseError(
+                ENDPOINT_CARD_NOS, status, f"malformed response: {e}"
+            ) from e
+        return list(communities.values())
+
+    async def get_communities(self) -> list:
         """Get list of communities (from card info)."""
-        if not self.access_token:
-            if not self.login():
-                return []
-        
         try:
-            url = f"{API_CARD_NOS}?access_token={self.access_token}"
-            resp = self._session.post(
-                url,
-                headers={"Content-Type": "application/json"},
-                json={"userId": self.user_id},
-                timeout=10
-            )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get("status") == 1:
-                    cards = data.get("data", [])
-                    # Extract unique communities
-                    communities = {}
-                    for card in cards:
-                        cid = card.get("communityId")
-                        cname = card.get("communityName", f"小区 {cid}")
-                        door_cid = card.get("doorCommunityId", cid)
-                        if cid and cid not in communities:
-                            communities[cid] = {
-                                "id": cid,
-                                "name": cname,
-                                "door_community_id": door_cid,
-                                "card_no": card.get("cardNo", self.phone)
-                            }
-                    return list(communities.values())
-            
-            _LOGGER.error("Get communities failed: %s", resp.text)
-            return []
-            
+            communities = await self.fetch_communities()
         except Exception as e:
             _LOGGER.error("Get communities error: %s", e)
             return []
+        return [community.as_dict() for community in communities]
+
+    async def _get_door_page(
+        self, community_id: str, card_no: str, begin: int, end: int
+    ) -> tuple:
+        """Fetch rows ``begin``..``end`` of the door list.
+
+        Returns the raw door rows, the total the server reported (or None
+        if it did not report one) and the digest of the page body. Raises
+        HiLifeApiError on failure.
+        """
+        key = (community_id, card_no)
+        memo = self._door_pages.setdefault(key, {}).setdefault(begin, {})
+        query = self._door_queries.get(key)
+        if query is None:
+            query = self._door_queries[key] = {
+                "communityID": str(community_id),
+                "communityId": str(community_id),
+                "type": "1",
+                "userId": self.user_id,
+                "cardNo": card_no,
+                "phoneNo": card_no,
+                "lat": "0",
+                "lon": "0",
+            }
+        start = time.monotonic()
+        try:
+            status, data = await self._post_json(
+                ENDPOINT_GET_DOORS,
+                API_GET_DOORS,
+                {**query, "begin": begin, "end": end},
+                {"Content-Type": "application/json"},
+                memo=memo,
+            )
+        except Exception as e:
+            self.metrics.record(
+                ENDPOINT_GET_DOORS, time.monotonic() - start, -1, type(e).__name__
+            )
+            if isinstance(e, CONNECTION_ERRORS):
+                raise HiLifeConnectionError(str(e) or type(e).__name__) from e
+            if isinstance(e, ValueError):
+                raise HiLifeResponseError(
+                    ENDPOINT_GET_DOORS, 200, "invalid JSON"
+                ) from e
+            raise
+        outcome = self._outcome(status, data)
+        self.metrics.record(ENDPOINT_GET_DOORS, time.monotonic() - start, *outcome)
+
+        if status != 200 or outcome[0] != 1:
+            raise HiLifeResponseError(ENDPOINT_GET_DOORS, *outcome)
+
+        page = data.get("data") or {}
+        rows = (page.get("dataList") or []) if isinstance(page, dict) else None
+        if not isinstance(rows, list):
+            raise HiLifeResponseError(
+                ENDPOINT_GET_DOORS, status, "malformed response: no door list"
+            )
+        total = None
+        for key in DOOR_TOTAL_KEYS:
+            if page.get(key) is not None:
+                try:
+                    total = int(page[key])
+                except (TypeError, ValueError):
+                    continue
+                break
+        return rows, total, memo.get("digest")
+
+    async def fetch_doors(
+        self,
+        community_id: str,
+        card_no: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        known: Optional[list] = None,
+    ) -> list:
+        """Get the ``Door`` records of a community.
+
+        Keeps fetching pages of ``page_size`` doors until the server has
+        no more. Once the first page reports the total, the remaining
+        pages are fetched concurrently. A failed page fails the whole
+        call, so callers never see a truncated list.
+
+        ``known`` is the list a previous call returned. If every page is
+        byte-identical to the pages the client last built a list from,
+        that list is returned without rebuilding it. It is ``known``
+        unless another caller of the same community saw a change first.
 
-    def get_doors(self, community_id: str, card_no: str = None) -> list:
-        """Get list of doors for a community."""
-        if not self.access_token:
-            if not self.login():
-                return []
-        
+        Raises HiLifeApiError, or a subclass of it, on failure.
+        """
         if not card_no:
             card_no = self.phone
-        
+
+        start = time.monotonic()
+        first_rows, total, digest = await self._get_door_page(
+            community_id, card_no, 1, page_size
+        )
+        rows = list(first_rows)
+        begins = [1]
+        digests = [digest]
+
+        if total is not None and total > len(rows):
+            # Total known: fetch the remaining pages concurrently,
+            # following the server if it capped the first page
+            step = len(rows) or page_size
+            semaphore = asyncio.Semaphore(PAGE_CONCURRENCY)
+
+            async def fetch(begin: int):
+                async with semaphore:
+                    return await self._get_door_page(
+                        community_id, card_no, begin, begin + step - 1
+                    )
+
+            begins.extend(range(step + 1, total + 1, step))
+            if len(begins) > MAX_DOOR_PAGES:
+                _LOGGER.warning(
+                    "Community %s reports %d doors, only fetching the first %d "
+                    "pages",
+                    community_id,
+                    total,
+                    MAX_DOOR_PAGES,
+                )
+                del begins[MAX_DOOR_PAGES:]
+            results = await asyncio.gather(
+                *(fetch(begin) for begin in begins[1:])
+            )
+            for page_rows, _, digest in results:
+                rows.extend(page_rows)
+                digests.append(digest)
+
+        elif total is None:
+            # Total unknown: keep going until a short page, or a page
+            # without new doors from a server that ignores begin and end
+            seen = _door_ids(first_rows)
+            page_rows = first_rows
+            while len(page_rows) >= page_size:
+                if len(begins) >= MAX_DOOR_PAGES:
+                    _LOGGER.warning(
+                        "Community %s has more than %d pages of doors, "
+                        "stopping there",
+                        community_id,
+                        MAX_DOOR_PAGES,
+                    )
+                    break
+                begin = len(begins) * page_size + 1
+                page_rows, _, digest = await self._get_door_page(
+                    community_id, card_no, begin, begin + page_size - 1
+                )
+                page_ids = _door_ids(page_rows)
+                if page_rows and page_ids <= seen:
+                    _LOGGER.warning(
+                        "Page %d of the doors of community %s has no new "
+                        "doors, stopping there",
+                        len(begins) + 1,
+                        community_id,
+                    )
+                    break
+                seen |= page_ids
+                begins.append(begin)
+                rows.extend(page_rows)
+                digests.append(digest)
+
+        # Forget pages past the end of a shrunken list
+        key = (community_id, card_no)
+        memos = self._door_pages[key]
+        for begin in memos.keys() - set(begins):
+            del memos[begin]
+
+        # The page memos are shared by every caller, so compare with the
+        # pages the last list was built from, not with the last response
+        digests = tuple(digests)
+        built, latest = self._door_lists.get(key, (None, None))
+        if known is not None and digests == built:
+            _LOGGER.debug(
+                "Doors of community %s unchanged (%.3fs)",
+                community_id,
+                time.monotonic() - start,
+            )
+            return latest
+
+        doors = {}
         try:
-            url = f"{API_GET_DOORS}?access_token={self.access_token}"
-            resp = self._session.post(
-                url,
-                headers={"Content-Type": "application/json"},
-                json={
-                    "communityID": str(community_id),
-                    "communityId": str(community_id),
-                    "type": "1",
-                    "userId": self.user_id,
-                    "cardNo": card_no,
-                    "phoneNo": card_no,
-                    "begin": 1,
-                    "end": 200,
-                    "lat": "0",
-                    "lon": "0",
-                },
-                timeout=10
-            )
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                if data.get("status") == 1:
-                    doors = data.get("data", {}).get("dataList", [])
-                    return [
-                        {
-                            "id": door.get("msDoorId"),
-                            "name": door.get("msDoorName"),
-                            "door_id": door.get("id"),
-                            "card_no": door.get("cardno", card_no),
-                        }
-                        for door in doors
-                    ]
-            
-            _LOGGER.error("Get doors failed: %s", resp.text)
-            return []
-            
+            for row in rows:
+                door_id = row.get("msDoorId")
+                if door_id is not None and door_id not in doors:
+                    doors[door_id] = Door(
+                        door_id,
+                        row.get("msDoorName"),
+                        row.get("id"),
+                        row.get("cardno", card_no),
+                        community_id,
+                    )
+        except MALFORMED_ERRORS as e:
+            raise HiLifeResponseError(
+                ENDPOINT_GET_DOORS, 200, f"malformed response: {e}"
+            ) from e
+
+        _LOGGER.debug(
+            "Fetched %d doors for community %s in %d pages (%.3fs)",
+            len(doors),
+            community_id,
+            len(begins),
+            time.monotonic() - start,
+        )
+        doors = list(doors.values())
+        self._door_lists[key] = (digests, doors)
+        return doors
+
+    async def get_doors(
+        self,
+        community_id: str,
+        card_no: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        known: Optional[list] = None,
+    ) -> list:
+        """Get the ``Door`` records of a community, or [] on error."""
+        try:
+            return await self.fetch_doors(community_id, card_no, page_size, known)
         except Exception as e:
             _LOGGER.error("Get doors error: %s", e)
             return []
 
-    def open_door(
+    def build_open_door_payload(
         self,
         door_id: int,
         door_name: str,
         community_id: str,
         door_community_id: str = None,
         card_no: str = None
-    ) -> dict:
-        """Open a door."""
-        if not self.access_token:
-            if not self.login():
-                return {"status": -1, "msg": "登录失败"}
-        
+    ) -> OpenDoorRequest:
+        """Build and serialize the openDoor request of a door.
+
+        The body only depends on the door, so callers that open the same
+        door repeatedly should build it once and use open_door_payload.
+        """
         if not door_community_id:
             door_community_id = community_id
         if not card_no:
             card_no = self.phone
-        
-        try:
-            url = f"{API_OPEN_DOOR}?access_token={self.access_token}"
-            resp = self._session.post(
-                url,
-                headers={"Content-Type": "application/json; charset=UTF-8"},
-                json={
+
+        return OpenDoorRequest(
+            door_id,
+            json_dumps(
+                {
                     "doorName": door_name,
                     "doorCommunityId": str(door_community_id),
                     "communityId": str(community_id),
@@ -187,25 +697,222 @@ class HiLifeApi:
                     "cardNo": card_no,
                     "userId": self.user_id,
                     "isScan": 2,
-                },
-                timeout=10
+                }
+            ),
+        )
+
+    async def open_door(
+        self,
+        door_id: int,
+        door_name: str,
+        community_id: str,
+        door_community_id: str = None,
+        card_no: str = None
+    ) -> dict:
+        """Open a door."""
+        return await self.open_door_payload(
+            self.build_open_door_payload(
+                door_id, door_name, community_id, door_community_id, card_no
+            )
+        )
+
+    async def open_door_payload(self, request: OpenDoorRequest) -> dict:
+        """Open a door with a request from build_open_door_payload.
+
+        The time spent in each stage is kept in ``last_open_timing``:
+        ``queue`` waiting for an access token and the rate limiter,
+        ``request`` until the response headers arrive (connection setup
+        plus server time) and ``read`` for the body. ``warm`` tells
+        whether a pooled connection to the door host was known to be
+        alive.
+        """
+        timing = {"warm": self.connection_warm}
+        start = time.monotonic()
+        outcome = (-1, None)
+        try:
+            status, result = await self._post_json(
+                ENDPOINT_OPEN_DOOR,
+                API_OPEN_DOOR,
+                request.body,
+                {"Content-Type": "application/json; charset=UTF-8"},
+                timing,
+                OPEN_RETRY,
             )
-            
-            if resp.status_code == 200:
-                result = resp.json()
+            outcome = self._outcome(status, result)
+
+            if status == 200:
                 _LOGGER.debug("Open door result: %s", result)
                 return result
-            
-            return {"status": -1, "msg": f"HTTP {resp.status_code}"}
-            
+
+            return {"status": -1, "msg": f"HTTP {status}"}
+
         except Exception as e:
             _LOGGER.error("Open door error: %s", e)
+            outcome = (-1, type(e).__name__)
             return {"status": -1, "msg": str(e)}
 
-    def test_connection(self) -> bool:
+        finally:
+            timing["total"] = time.monotonic() - start
+            self.last_open_timing = timing
+            self.metrics.record(ENDPOINT_OPEN_DOOR, timing["total"], *outcome)
+            _LOGGER.debug(
+                "Open door %s timing: queue=%.3fs request=%.3fs read=%.3fs "
+                "total=%.3fs warm=%s",
+                request.door_id,
+                timing.get("queue", 0),
+                timing.get("request", 0),
+                timing.get("read", 0),
+                timing["total"],
+                timing["warm"],
+            )
+
+    @property
+    def connection_warm(self) -> bool:
+        """Return True if a request reached the door host recently."""
+        return (
+            self._last_activity is not None
+            and time.monotonic() - self._last_activity < KEEPALIVE_WINDOW
+        )
+
+    def set_timeouts(self, connect_timeout: float, read_timeout: float) -> None:
+        """Use new connect and read timeouts for the following requests."""
+        self._timeout = aiohttp.ClientTimeout(
+            connect=connect_timeout, sock_read=read_timeout
+        )
+
+    def start_keepalive(self, interval: float) -> None:
+        """Keep a pooled connection to the door host alive.
+
+        Sends a HEAD request every ``interval`` seconds unless another
+        request already used the connection, so a door open does not pay
+        for a fresh TCP and TLS handshake.
+        """
+        self._stop_keepalive()
+        if interval > 0:
+            self._keepalive_interval = interval
+            self._keepalive_handle = asyncio.get_running_loop().call_later(
+                interval, self._keepalive
+            )
+
+    def _stop_keepalive(self) -> None:
+        """Cancel the keep-alive timer."""
+        if self._keepalive_handle is not None:
+            self._keepalive_handle.cancel()
+            self._keepalive_handle = None
+
+    def _keepalive(self) -> None:
+        """Ping the door host if the connection has been idle."""
+        loop = asyncio.get_running_loop()
+        idle = (
+            self._last_activity is None
+            or time.monotonic() - self._last_activity >= self._keepalive_interval
+        )
+        if idle and (self._keepalive_task is None or self._keepalive_task.done()):
+            self._keepalive_task = asyncio.ensure_future(self.async_keep_warm())
+        self._keepalive_handle = loop.call_later(
+            self._keepalive_interval, self._keepalive
+        )
+
+    async def async_keep_warm(self) -> None:
+        """Send a cheap request to the door host to keep the connection open."""
+        try:
+            async with self._session.head(
+                DOOR_HOST_URL,
+                allow_redirects=False,
+                timeout=self._timeout,
+                ssl=False,
+            ):
+                self._last_activity = time.monotonic()
+        except Exception as e:
+            _LOGGER.debug("Keep-alive to door host failed: %s", e)
+
+    async def test_connection(self) -> bool:
         """Test the connection."""
-        if not self.login():
+        if not await self.login():
             return False
-        
-        communities = self.get_communities()
+
+        communities = await self.get_communities()
         return len(communities) > 0
+
+
+class HiLifeApi:
+    """Blocking HiLife Door API Client.
+
+    Thin compatibility wrapper that drives a :class:`HiLifeAsyncApi` on a
+    private event loop. Never use it from inside Home Assistant's loop.
+    """
+
+    def __init__(self, phone: str, password: str, user_id: str):
+        """Initialize the API client."""
+        self.phone = phone
+        self.password = password
+        self.user_id = user_id
+        self._loop = asyncio.new_event_loop()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._api: Optional[HiLifeAsyncApi] = None
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """Return the current access token."""
+        return self._api.access_token if self._api else None
+
+    async def _async_call(self, method: str, *args):
+        """Run one async client method, creating the session on first use."""
+        if self._api is None:
+            self._session = aiohttp.ClientSession()
+            self._api = HiLifeAsyncApi(
+                self._session, self.phone, self.password, self.user_id
+            )
+        return await getattr(self._api, method)(*args)
+
+    def _call(self, method: str, *args):
+        return self._loop.run_until_complete(self._async_call(method, *args))
+
+    def login(self) -> bool:
+        """Login and get access token."""
+        return self._call("login")
+
+    def get_communities(self) -> list:
+        """Get list of communities (from card info)."""
+        return self._call("get_communities")
+
+    def get_doors(
+        self,
+        community_id: str,
+        card_no: str = None,
+        page_size: int = DEFAULT_PAGE_SIZE,
+    ) -> list:
+        """Get list of doors for a community, as dicts like before."""
+        doors = self._call("get_doors", community_id, card_no, page_size)
+        return [door.as_dict() for door in doors]
+
+    def open_door(
+        self,
+        door_id: int,
+        door_name: str,
+        community_id: str,
+        door_community_id: str = None,
+        card_no: str = None
+    ) -> dict:
+        """Open a door."""
+        return self._call(
+            "open_door",
+            door_id,
+            door_name,
+            community_id,
+            door_community_id,
+            card_no,
+        )
+
+    def test_connection(self) -> bool:
+        """Test the connection."""
+        return self._call("test_connection")
+
+    def close(self) -> None:
+        """Close the underlying session and event loop."""
+        if self._session is not None:
+            self._api.close()
+            self._loop.run_until_complete(self._session.close())
+            self._session = None
+            self._api = None
+        self._loop.close()
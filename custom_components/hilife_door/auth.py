@@ -0,0 +1,133 @@
+"""Token lifecycle management for the HiLife Door API."""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from .const import TOKEN_REFRESH_MARGIN
+
+_LOGGER = logging.getLogger(__name__)
+
+TokenGrant = Callable[[], Awaitable[Optional[dict]]]
+RefreshGrant = Callable[[str], Awaitable[Optional[dict]]]
+
+
+class TokenManager:
+    """Track the OAuth token, refresh it early and serialize re-logins.
+
+    Every caller goes through ``async_get_token``. Only one login or
+    refresh is ever in flight; concurrent callers await the same task.
+    A timer renews the token ``TOKEN_REFRESH_MARGIN`` seconds before it
+    expires, so requests normally never wait for the token endpoint.
+    """
+
+    def __init__(
+        self,
+        password_grant: TokenGrant,
+        refresh_grant: RefreshGrant,
+        refresh_margin: int = TOKEN_REFRESH_MARGIN,
+    ):
+        """Initialize the token manager."""
+        self._password_grant = password_grant
+        self._refresh_grant = refresh_grant
+        self._refresh_margin = refresh_margin
+        self.access_token: Optional[str] = None
+        self.refresh_token: Optional[str] = None
+        self.expires_at: Optional[float] = None
+        self._pending: Optional[asyncio.Task] = None
+        self._refresh_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def expired(self) -> bool:
+        """Return True when there is no usable access token."""
+        if not self.access_token:
+            return True
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    async def async_get_token(self) -> Optional[str]:
+        """Return a valid access token, renewing it if needed."""
+        if not self.expired:
+            return self.access_token
+        await self.async_renew()
+        return None if self.expired else self.access_token
+
+    async def async_login(self) -> bool:
+        """Perform a password login, sharing any login already in flight."""
+        return await self._async_single_flight(self._async_password_login)
+
+    async def async_renew(self) -> bool:
+        """Renew the token, preferring the refresh grant over a password login."""
+        return await self._async_single_flight(self._async_renew)
+
+    def invalidate(self, token: Optional[str]) -> None:
+        """Drop ``token`` after the server rejected it.
+
+        Only clears the token if it is still the current one, so a stale
+        failure cannot discard a token another caller has just obtained.
+        """
+        if token is not None and token == self.access_token:
+            _LOGGER.debug("Access token rejected by server, invalidating")
+            self.access_token = None
+            self.expires_at = None
+
+    def close(self) -> None:
+        """Cancel the refresh timer and any pending token request."""
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
+        if self._pending is not None and not self._pending.done():
+            self._pending.cancel()
+        self._pending = None
+
+    async def _async_single_flight(self, func) -> bool:
+        """Run ``func`` unless a token request is already in flight."""
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.ensure_future(func())
+        return await asyncio.shield(self._pending)
+
+    async def _async_password_login(self) -> bool:
+        """Log in with phone and password."""
+        return self._store(await self._password_grant())
+
+    async def _async_renew(self) -> bool:
+        """Try the refresh grant first and fall back to a password login."""
+        if self.refresh_token:
+            if self._store(await self._refresh_grant(self.refresh_token)):
+                _LOGGER.debug("Access token refreshed")
+                return True
+            _LOGGER.debug("Token refresh failed, falling back to password login")
+            self.refresh_token = None
+        return await self._async_password_login()
+
+    def _store(self, data: Optional[dict]) -> bool:
+        """Store a token response and schedule the next refresh."""
+        if not data or not data.get("access_token"):
+            return False
+
+        self.access_token = data["access_token"]
+        self.refresh_token = data.get("refresh_token", self.refresh_token)
+        expires_in = data.get("expires_in")
+        try:
+            expires_in = int(expires_in) if expires_in is not None else None
+        except (TypeError, ValueError):
+            expires_in = None
+
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
+
+        if expires_in and expires_in > 0:
+            self.expires_at = time.monotonic() + expires_in
+            delay = max(expires_in - self._refresh_margin, expires_in / 2)
+            self._refresh_handle = asyncio.get_running_loop().call_later(
+                delay, self._background_refresh
+            )
+        else:
+            self.expires_at = None
+        return True
+
+    def _background_refresh(self) -> None:
+        """Renew the token from the refresh timer."""
+        self._refresh_handle = None
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.ensure_future(self._async_renew())
@@ -0,0 +1,66 @@
+"""Persistent door list cache for the HiLife Door integration."""
+import logging
+from typing import Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_VERSION
+from .models import Door
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DoorCache:
+    """Door list and community metadata of one config entry, kept on disk.
+
+    Lets the entry create its entities from a local file read at startup
+    and keep working while the cloud is unreachable.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        """Initialize the cache."""
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self.doors: list = []
+        self.communities: list = []
+
+    async def async_load(self) -> bool:
+        """Load the cache, return True if it held any doors."""
+        data: Optional[dict] = await self._store.async_load()
+        if not data:
+            return False
+
+        self.doors = [Door.from_dict(door) for door in data.get("doors", [])]
+        self.communities = data.get("communities", [])
+        _LOGGER.debug("Loaded %d cached doors", len(self.doors))
+        return bool(self.doors)
+
+    async def async_update(
+        self, doors: Optional[list] = None, communities: Optional[list] = None
+    ) -> None:
+        """Store fresh cloud data, writing only if something changed.
+
+        ``doors`` comes from a successful fetch, so an empty list means the
+        account lost its doors and is stored too. ``get_communities``
+        returns an empty list on error, so that never replaces the cached
+        communities.
+        """
+        changed = False
+        if doors is not None and doors != self.doors:
+            self.doors = doors
+            changed = True
+        if communities and communities != self.communities:
+            self.communities = communities
+            changed = True
+
+        if changed:
+            await self._store.async_save(
+                {
+                    "doors": [door.as_dict() for door in self.doors],
+                    "communities": self.communities,
+                }
+            )
+
+    async def async_remove(self) -> None:
+        """Delete the cache file."""
+        await self._store.async_remove()
@@ -0,0 +1,123 @@
+"""Community helpers for the HiLife Door integration."""
+import logging
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.entity import DeviceInfo
+
+from .const import (
+    CONF_COMMUNITIES,
+    CONF_COMMUNITY_ID,
+    CONF_COMMUNITY_NAME,
+    CONF_PHONE,
+    DOMAIN,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def entry_communities(entry: ConfigEntry) -> list:
+    """Return the communities an entry covers.
+
+    The options override the communities chosen in the config flow.
+    Entries created before an entry could cover several communities
+    only hold the fields of a single one.
+    """
+    communities = entry.options.get(CONF_COMMUNITIES) or entry.data.get(
+        CONF_COMMUNITIES
+    )
+    if communities:
+        return communities
+
+    community_id = entry.data[CONF_COMMUNITY_ID]
+    return [
+        {
+            "id": community_id,
+            "name": entry.data.get(CONF_COMMUNITY_NAME, f"小区 {community_id}"),
+            "door_community_id": entry.data.get("door_community_id", community_id),
+            "card_no": entry.data.get("card_no", entry.data[CONF_PHONE]),
+        }
+    ]
+
+
+def community_identifier(entry_id: str, community_id) -> tuple:
+    """Return the device identifier of a community."""
+    return (DOMAIN, f"{entry_id}_{community_id}")
+
+
+def community_device_info(entry_id: str, community: dict) -> DeviceInfo:
+    """Return the device that groups the doors of a community."""
+    return DeviceInfo(
+        identifiers={community_identifier(entry_id, community["id"])},
+        name=community["name"],
+        manufacturer="HiLife 合生活",
+        model="Smart Door",
+    )
+
+
+@callback
+def async_update_devices(
+    hass: HomeAssistant, entry: ConfigEntry, communities: list, doors: list
+) -> None:
+    """Move doors onto their community device and drop stale devices.
+
+    Doors used to be a device each. Their entities are moved to the
+    device of their community, keeping ids and customizations, before
+    the old devices are removed. Devices of communities the entry no
+    longer covers are removed too.
+    """
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+
+    community_of_door = {
+        str(door.id): door.community_id or communities[0]["id"]
+        for door in doors
+    }
+    wanted = {
+        community_identifier(entry.entry_id, community["id"])
+        for community in communities
+    }
+    community_devices: dict = {}
+
+    for device in dr.async_entries_for_config_entry(
+        device_registry, entry.entry_id
+    ):
+        identifiers = {
+            identifier for identifier in device.identifiers if identifier[0] == DOMAIN
+        }
+        if not identifiers or (DOMAIN, entry.entry_id) in identifiers:
+            # The entry's own service device
+            continue
+        if identifiers & wanted:
+            continue
+
+        key = next(iter(identifiers))[1]
+        community = None
+        if not key.startswith(f"{entry.entry_id}_"):
+            # A door device; before an entry could cover several
+            # communities, all of its doors were in the only one
+            community_id = community_of_door.get(key, communities[0]["id"])
+            community = next(
+                (c for c in communities if c["id"] == community_id), None
+            )
+        if community is not None:
+            if community["id"] not in community_devices:
+                community_devices[community["id"]] = (
+                    device_registry.async_get_or_create(
+                        config_entry_id=entry.entry_id,
+                        **community_device_info(entry.entry_id, community),
+                    )
+                )
+            target = community_devices[community["id"]]
+            for entity in er.async_entries_for_device(
+                entity_registry, device.id, include_disabled_entities=True
+            ):
+                entity_registry.async_update_entity(
+                    entity.entity_id, device_id=target.id
+                )
+
+        _LOGGER.debug("Removing device %s", device.name)
+        device_registry.async_update_device(
+            device.id, remove_config_entry_id=entry.entry_id
+        )
@@ -3,22 +3,48 @@ import logging
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import callback
+from homeassistant.components.file_upload import process_uploaded_file
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import config_validation as cv, selector
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from .const import (
     DOMAIN,
     CONF_PHONE,
     CONF_PASSWORD,
     CONF_USER_ID,
-    CONF_COMMUNITY_ID,
-    CONF_COMMUNITY_NAME,
+    CONF_COMMUNITIES,
+    CONF_CONNECT_TIMEOUT,
+    CONF_FILE,
+    CONF_KEEPALIVE_INTERVAL,
+    CONF_PAGE_SIZE,
+    CONF_READ_TIMEOUT,
+    CONF_UNLOCK_HOLD_TIME,
+    CONF_WEBHOOK_ID,
+    CONF_WEBHOOK_SECRET,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_KEEPALIVE_INTERVAL,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_UNLOCK_HOLD_TIME,
 )
-from .api import HiLifeApi
+from .api import HiLifeAsyncApi
+from .community import entry_communities
+from .onboarding import async_import_accounts, parse_accounts_csv
+from .registry import account_key, async_store_handoff
+from .webhook import async_webhook_url
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _read_accounts_file(hass: HomeAssistant, file_id: str) -> list:
+    """Read the accounts of an uploaded CSV file."""
+    with process_uploaded_file(hass, file_id) as path:
+        return parse_accounts_csv(path.read_text(encoding="utf-8-sig"))
+
+
 class HiLifeDoorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for HiLife Door."""
 
@@ -30,10 +56,20 @@ class HiLifeDoorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self._password: str = ""
         self._user_id: str = ""
         self._communities: list = []
-        self._api: HiLifeApi = None
+        self._api: HiLifeAsyncApi = None
+        self._door_tasks: dict = {}
+        self._handed_off = False
 
     async def async_step_user(self, user_input=None) -> FlowResult:
-        """Handle the initial step - credentials."""
+        """Let the user add one account or import many."""
+        if user_input is not None:
+            return await self.async_step_account(user_input)
+        return self.async_show_menu(
+            step_id="user", menu_options=["account", "upload"]
+        )
+
+    async def async_step_account(self, user_input=None) -> FlowResult:
+        """Handle the credentials of one account."""
         errors = {}
 
         if user_input is not None:
@@ -41,44 +77,38 @@ class HiLifeDoorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self._password = user_input[CONF_PASSWORD]
             self._user_id = user_input[CONF_USER_ID]
 
-            # Test connection
-            self._api = HiLifeApi(self._phone, self._password, self._user_id)
-            
-            valid = await self.hass.async_add_executor_job(
-                self._api.test_connection
+            if self._api is not None:
+                self._async_discard_client()
+            self._api = HiLifeAsyncApi(
+                async_get_clientsession(self.hass, verify_ssl=False),
+                self._phone,
+                self._password,
+                self._user_id,
             )
 
-            if valid:
-                # Get communities
-                self._communities = await self.hass.async_add_executor_job(
-                    self._api.get_communities
-                )
-                
+            # Login and list communities once; the same calls double as
+            # the connection test
+            if not await self._api.login():
+                errors["base"] = "cannot_connect"
+            else:
+                self._communities = await self._api.get_communities()
+
                 if len(self._communities) == 0:
                     errors["base"] = "no_communities"
-                elif len(self._communities) == 1:
-                    # Only one community, skip selection
-                    community = self._communities[0]
-                    return self.async_create_entry(
-                        title=f"HiLife - {community['name']}",
-                        data={
-                            CONF_PHONE: self._phone,
-                            CONF_PASSWORD: self._password,
-                            CONF_USER_ID: self._user_id,
-                            CONF_COMMUNITY_ID: community["id"],
-                            CONF_COMMUNITY_NAME: community["name"],
-                            "door_community_id": community["door_community_id"],
-                            "card_no": community["card_no"],
-                        },
-                    )
                 else:
+                    # Fetch the doors of every community while the user
+                    # picks one, so setup needs no further requests
+                    self._async_prefetch_doors()
+
+                    if len(self._communities) == 1:
+                        # Only one community, skip selection
+                        return await self._async_create_entry(self._communities)
+
                     # Multiple communities, show selection
                     return await self.async_step_community()
-            else:
-                errors["base"] = "cannot_connect"
 
         return self.async_show_form(
-            step_id="user",
+            step_id="account",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_PHONE): str,
@@ -92,36 +122,74 @@ class HiLifeDoorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
-    async def async_step_community(self, user_input=None) -> FlowResult:
-        """Handle community selection step."""
+    async def async_step_upload(self, user_input=None) -> FlowResult:
+        """Import every account of an uploaded CSV file."""
         errors = {}
 
         if user_input is not None:
-            community_id = user_input[CONF_COMMUNITY_ID]
-            
-            # Find selected community
-            community = next(
-                (c for c in self._communities if str(c["id"]) == str(community_id)),
-                None
-            )
-            
-            if community:
-                return self.async_create_entry(
-                    title=f"HiLife - {community['name']}",
-                    data={
-                        CONF_PHONE: self._phone,
-                        CONF_PASSWORD: self._password,
-                        CONF_USER_ID: self._user_id,
-                        CONF_COMMUNITY_ID: community["id"],
-                        CONF_COMMUNITY_NAME: community["name"],
-                        "door_community_id": community["door_community_id"],
-                        "card_no": community["card_no"],
+            try:
+                accounts = await self.hass.async_add_executor_job(
+                    _read_accounts_file, self.hass, user_input[CONF_FILE]
+                )
+            except (ValueError, UnicodeDecodeError) as err:
+                _LOGGER.error("Invalid accounts file: %s", err)
+                errors["base"] = "invalid_file"
+            else:
+                report = await async_import_accounts(self.hass, accounts)
+                return self.async_abort(
+                    reason="imported",
+                    description_placeholders={
+                        "created": str(len(report["created"])),
+                        "skipped": str(len(report["skipped"])),
+                        "failed": "\n".join(
+                            f"{failure[CONF_PHONE]}: {failure['error']}"
+                            for failure in report["failed"]
+                        )
+                        or "-",
                     },
                 )
+
+        return self.async_show_form(
+            step_id="upload",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_FILE): selector.FileSelector(
+                        selector.FileSelectorConfig(accept=".csv,text/csv")
+                    ),
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_import(self, import_data: dict) -> FlowResult:
+        """Create the entry of an account a bulk import validated."""
+        key = account_key(import_data[CONF_PHONE], import_data[CONF_USER_ID])
+        for entry in self._async_current_entries():
+            if account_key(entry.data[CONF_PHONE], entry.data[CONF_USER_ID]) == key:
+                return self.async_abort(reason="already_configured")
+
+        return self.async_create_entry(
+            title="HiLife - "
+            + "、".join(c["name"] for c in import_data[CONF_COMMUNITIES]),
+            data=import_data,
+        )
+
+    async def async_step_community(self, user_input=None) -> FlowResult:
+        """Handle community selection step."""
+        errors = {}
+
+        if user_input is not None:
+            selected = set(user_input[CONF_COMMUNITIES])
+            communities = [
+                c for c in self._communities if str(c["id"]) in selected
+            ]
+
+            if communities:
+                return await self._async_create_entry(communities)
             else:
                 errors["base"] = "invalid_community"
 
-        # Build community selection options
+        # Build community selection options; one entry can cover several
         community_options = {
             str(c["id"]): c["name"] for c in self._communities
         }
@@ -130,7 +198,9 @@ class HiLifeDoorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="community",
             data_schema=vol.Schema(
                 {
-                    vol.Required(CONF_COMMUNITY_ID): vol.In(community_options),
+                    vol.Required(
+                        CONF_COMMUNITIES, default=list(community_options)
+                    ): cv.multi_select(community_options),
                 }
             ),
             errors=errors,
@@ -139,6 +209,54 @@ class HiLifeDoorConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             },
         )
 
+    @callback
+    def _async_prefetch_doors(self) -> None:
+        """Start fetching the door list of every community concurrently."""
+        for community in self._communities:
+            self._door_tasks[community["id"]] = self.hass.async_create_task(
+                self._api.get_doors(community["id"], community["card_no"]),
+                f"{DOMAIN}_prefetch_doors_{community['id']}",
+            )
+
+    async def _async_create_entry(self, communities: list) -> FlowResult:
+        """Create the entry and hand the client and doors over to setup."""
+        # get_doors returns [] on error; setup then fetches the doors itself
+        doors = {
+            community["id"]: await self._door_tasks.pop(community["id"])
+            for community in communities
+        }
+        for task in self._door_tasks.values():
+            task.cancel()
+        self._door_tasks.clear()
+
+        async_store_handoff(self.hass, self._api, doors, self._communities)
+        self._handed_off = True
+
+        return self.async_create_entry(
+            title="HiLife - " + "、".join(c["name"] for c in communities),
+            data={
+                CONF_PHONE: self._phone,
+                CONF_PASSWORD: self._password,
+                CONF_USER_ID: self._user_id,
+                CONF_COMMUNITIES: communities,
+            },
+        )
+
+    @callback
+    def _async_discard_client(self) -> None:
+        """Cancel prefetches and close the client if setup did not take it."""
+        for task in self._door_tasks.values():
+            task.cancel()
+        self._door_tasks.clear()
+        if self._api is not None and not self._handed_off:
+            self._api.close()
+        self._api = None
+
+    @callback
+    def async_remove(self) -> None:
+        """Clean up when the flow is finished or aborted."""
+        self._async_discard_client()
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -155,17 +273,77 @@ class HiLifeDoorOptionsFlow(config_entries.OptionsFlow):
 
     async def async_step_init(self, user_input=None) -> FlowResult:
         """Manage the options."""
+        errors = {}
+        current = entry_communities(self.config_entry)
+        # Every community of the account, as last fetched by the entry
+        data = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        known = {str(c["id"]): c for c in current}
+        if data is not None:
+            known.update((str(c["id"]), c) for c in data["cache"].communities)
+
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            selected = user_input.pop(CONF_COMMUNITIES)
+            communities = [known[key] for key in known if key in selected]
+            if communities:
+                user_input[CONF_COMMUNITIES] = communities
+                return self.async_create_entry(title="", data=user_input)
+            errors["base"] = "invalid_community"
 
         return self.async_show_form(
             step_id="init",
             data_schema=vol.Schema(
                 {
+                    vol.Required(
+                        CONF_COMMUNITIES,
+                        default=[str(c["id"]) for c in current],
+                    ): cv.multi_select(
+                        {key: community["name"] for key, community in known.items()}
+                    ),
                     vol.Optional(
                         "scan_interval",
-                        default=self.config_entry.options.get("scan_interval", 300),
+                        default=self.config_entry.options.get(
+                            "scan_interval", DEFAULT_SCAN_INTERVAL
+                        ),
                     ): vol.All(vol.Coerce(int), vol.Range(min=60, max=3600)),
+                    vol.Optional(
+                        CONF_PAGE_SIZE,
+                        default=self.config_entry.options.get(
+                            CONF_PAGE_SIZE, DEFAULT_PAGE_SIZE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=10, max=1000)),
+                    vol.Optional(
+                        CONF_KEEPALIVE_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_KEEPALIVE_INTERVAL, DEFAULT_KEEPALIVE_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=14)),
+                    vol.Optional(
+                        CONF_UNLOCK_HOLD_TIME,
+                        default=self.config_entry.options.get(
+                            CONF_UNLOCK_HOLD_TIME, DEFAULT_UNLOCK_HOLD_TIME
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=60)),
+                    vol.Optional(
+                        CONF_CONNECT_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=60)),
+                    vol.Optional(
+                        CONF_READ_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=120)),
                 }
             ),
+            errors=errors,
+            description_placeholders={
+                "webhook_url": async_webhook_url(self.hass, self.config_entry)
+                if CONF_WEBHOOK_ID in self.config_entry.data
+                else "-",
+                "webhook_secret": self.config_entry.data.get(
+                    CONF_WEBHOOK_SECRET, "-"
+                ),
+            },
         )
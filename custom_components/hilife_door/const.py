@@ -8,12 +8,164 @@ CONF_PASSWORD = "password"
 CONF_USER_ID = "user_id"
 CONF_COMMUNITY_ID = "community_id"
 CONF_COMMUNITY_NAME = "community_name"
+CONF_COMMUNITIES = "communities"
+CONF_WEBHOOK_ID = "webhook_id"
+CONF_WEBHOOK_SECRET = "webhook_secret"
+CONF_ACCOUNTS = "accounts"
+CONF_FILE = "file"
+
+# hass.data keys
+DATA_ACCOUNTS = "accounts"
+DATA_HANDOFFS = "handoffs"
+DATA_INDEX = "index"
+DATA_PROFILER = "profiler"
 
 # API endpoints
 API_LOGIN = "https://token.91helife.com/oauth/token"
 API_CARD_NOS = "https://www.91helife.com/erp/front/interface/door/CardNos/three"
 API_GET_DOORS = "https://www.91helife.com/erp/front/interface/es/door/v3/getDoors"
 API_OPEN_DOOR = "https://www.91helife.com/erp/front/interface/door/openDoor/three"
+DOOR_HOST_URL = "https://www.91helife.com/"
+
+# Timeouts (seconds)
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 10
+
+# Circuit breaker: consecutive failures before a host is considered down,
+# and seconds before it is tried again
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RECOVERY_TIMEOUT = 30
+
+# Keep-alive for the door host. aiohttp drops idle pooled connections
+# after 15 seconds, so the ping has to come before that.
+CONF_KEEPALIVE_INTERVAL = "keepalive_interval"
+DEFAULT_KEEPALIVE_INTERVAL = 12
+KEEPALIVE_WINDOW = 15
+
+# Time a door is shown as unlocked after a successful open
+CONF_UNLOCK_HOLD_TIME = "unlock_hold_time"
+DEFAULT_UNLOCK_HOLD_TIME = 3
+
+# Door list polling (seconds): the option sets the first interval, which
+# drops to the fast interval after a change and doubles while nothing
+# changes, up to the maximum
+DEFAULT_SCAN_INTERVAL = 300
+POLL_FAST_INTERVAL = 60
+POLL_MAX_INTERVAL = 3600
+
+# Door list paging
+CONF_PAGE_SIZE = "page_size"
+DEFAULT_PAGE_SIZE = 200
+PAGE_CONCURRENCY = 4
+# Pages of one door list fetched at most, in case paging is ignored
+MAX_DOOR_PAGES = 100
+# Keys under which getDoors may report the total number of doors
+DOOR_TOTAL_KEYS = ("total", "totalCount", "count")
 
 # Auth
 AUTH_CLIENT = "esnMobileClient:esnMobile"
+
+# Token lifecycle
+TOKEN_REFRESH_MARGIN = 300  # seconds before expiry to renew the token
+# Body "status" values the cloud uses for a rejected or expired token
+TOKEN_INVALID_STATUSES = (401,)
+
+# Storage
+STORAGE_VERSION = 1
+
+# Door open history: attempts kept per entry, and seconds to batch
+# records before writing them to disk
+HISTORY_SIZE = 200
+HISTORY_SAVE_DELAY = 30
+# Automation and script runs remembered to tell which one opened a door
+HISTORY_ORIGINS = 500
+
+# Events
+EVENT_DOOR_OPENED = f"{DOMAIN}_opened"
+
+# Seconds between attempts to fetch the first door list of an entry
+# without cached doors, doubling up to the maximum
+SETUP_RETRY_DELAY = 30
+SETUP_RETRY_MAX_DELAY = 600
+
+# Seconds a logged-in client and door list from the config flow are kept
+# for the entry's setup before they are discarded
+HANDOFF_TTL = 300
+
+# Accounts a bulk import logs in and discovers at the same time
+BULK_IMPORT_CONCURRENCY = 8
+
+# Services
+SERVICE_OPEN_DOORS = "open_doors"
+ATTR_DOOR_ID = "door_id"
+ATTR_MAX_CONCURRENCY = "max_concurrency"
+ATTR_STAGGER = "stagger"
+ATTR_ORDERED = "ordered"
+DEFAULT_MAX_CONCURRENCY = 4
+SERVICE_OPEN_BY_NAME = "open_by_name"
+ATTR_NAME = "name"
+SERVICE_CREATE_WEBHOOK_TOKEN = "create_webhook_token"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_EXPIRES_IN = "expires_in"
+ATTR_ONE_TIME = "one_time"
+DEFAULT_TOKEN_EXPIRES_IN = 3600
+SERVICE_PROFILE = "profile"
+ATTR_DURATION = "duration"
+ATTR_CALLS = "calls"
+ATTR_MODE = "mode"
+ATTR_STALL_THRESHOLD = "stall_threshold"
+ATTR_RELOAD = "reload"
+
+# Profiling: "cprofile" traces every function call, "sample" records the
+# event loop's stack every PROFILE_SAMPLE_INTERVAL seconds. Steps of the
+# profiled calls that hold the loop longer than the threshold (ms) are
+# logged as stalls.
+PROFILE_MODES = ("cprofile", "sample")
+DEFAULT_PROFILE_DURATION = 60
+DEFAULT_STALL_THRESHOLD = 50
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_MAX_CALLS = 1000  # call breakdowns kept per profile
+
+# Webhook: header carrying the entry's webhook secret, and the most
+# temporary tokens kept per entry
+WEBHOOK_SECRET_HEADER = "X-HiLife-Secret"
+WEBHOOK_MAX_TOKENS = 100
+
+# Metrics
+ENDPOINT_LOGIN = "login"
+ENDPOINT_CARD_NOS = "CardNos/three"
+ENDPOINT_GET_DOORS = "getDoors"
+ENDPOINT_OPEN_DOOR = "openDoor/three"
+ENDPOINTS = (ENDPOINT_LOGIN, ENDPOINT_CARD_NOS, ENDPOINT_GET_DOORS, ENDPOINT_OPEN_DOOR)
+METRICS_WINDOW_SLOTS = 15  # rolling window of 15 one-minute slots
+METRICS_SLOT_SECONDS = 60
+METRICS_MAX_MESSAGES = 20  # distinct failure messages kept per endpoint
+METRICS_UPDATE_DELAY = 10  # seconds a latency sensor batches calls for
+
+# Client-side rate limits per account: (requests per second, burst) for
+# each endpoint, and for all endpoints together
+RATE_LIMITS = {
+    ENDPOINT_LOGIN: (1 / 20, 3),
+    ENDPOINT_CARD_NOS: (1 / 2, 5),
+    ENDPOINT_GET_DOORS: (5, 20),
+    ENDPOINT_OPEN_DOOR: (2, 10),
+}
+RATE_LIMIT_ACCOUNT = (10, 30)
+
+# Requests waiting for a slot go in priority order; the door opens and
+# the logins they may need come before anything done in the background
+PRIORITY_OPEN = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BACKGROUND = 2
+ENDPOINT_PRIORITIES = {
+    ENDPOINT_LOGIN: PRIORITY_OPEN,
+    ENDPOINT_CARD_NOS: PRIORITY_INTERACTIVE,
+    ENDPOINT_GET_DOORS: PRIORITY_BACKGROUND,
+    ENDPOINT_OPEN_DOOR: PRIORITY_OPEN,
+}
+
+# Seconds over which the first poll of entries with cached doors is
+# spread, so entries of one account do not poll in lockstep
+POLL_START_JITTER = 30
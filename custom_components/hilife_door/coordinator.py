@@ -0,0 +1,175 @@
+"""Data update coordinator for the HiLife Door integration."""
+import asyncio
+import dataclasses
+import logging
+from datetime import timedelta
+from typing import Callable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from .api import HiLifeAsyncApi
+from .cache import DoorCache
+from .const import (
+    CONF_PAGE_SIZE,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    POLL_FAST_INTERVAL,
+    POLL_MAX_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HiLifeDoorCoordinator(DataUpdateCoordinator):
+    """Poll the door lists of the communities of one config entry.
+
+    Every community is fetched concurrently in one cycle, sharing the
+    account's token. ``data`` maps ``msDoorId`` to the ``Door`` records
+    returned by ``fetch_doors``, shared with the cache and the entities.
+    Listeners are only called when a door list actually changed.
+
+    The poll interval adapts: it drops to ``POLL_FAST_INTERVAL`` after a
+    change or a door open and doubles after every unchanged poll, up to
+    ``POLL_MAX_INTERVAL``. Polling stops while no door entity is enabled.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: HiLifeAsyncApi,
+        cache: DoorCache,
+        communities: list,
+    ):
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(
+                seconds=entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+            ),
+            always_update=False,
+        )
+        self._fast_interval = timedelta(seconds=POLL_FAST_INTERVAL)
+        self._max_interval = timedelta(seconds=POLL_MAX_INTERVAL)
+        # Community id -> the list the last poll returned; empty until
+        # this coordinator has polled, so the first poll always rebuilds
+        self._doors: dict = {}
+        # Entity sync callbacks; kept apart from ``_listeners`` so only
+        # enabled entities keep the poll scheduled
+        self._sync_listeners: list = []
+        self.api = api
+        self.cache = cache
+        self.communities = communities
+        self.page_size = entry.options.get(CONF_PAGE_SIZE, DEFAULT_PAGE_SIZE)
+        # Doors cached before entries covered several communities have
+        # no community id and belong to the entry's only community
+        default = communities[0]["id"]
+        ids = {community["id"] for community in communities}
+        self.data = {
+            door.id: door
+            if door.community_id is not None
+            else dataclasses.replace(door, community_id=default)
+            for door in cache.doors
+            if door.community_id in ids or door.community_id is None
+        }
+
+    @callback
+    def async_add_sync_listener(
+        self, update_callback: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Call ``update_callback`` on changes without keeping polls alive."""
+        self._sync_listeners.append(update_callback)
+        return lambda: self._sync_listeners.remove(update_callback)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Sync entities first, then update them."""
+        for update_callback in list(self._sync_listeners):
+            update_callback()
+        super().async_update_listeners()
+
+    @callback
+    def async_poll_soon(self) -> None:
+        """Go back to the fast poll interval, e.g. after a door was opened."""
+        if self.update_interval <= self._fast_interval:
+            return
+        self.update_interval = self._fast_interval
+        if self._listeners:
+            self._schedule_refresh()
+
+    async def _async_update_data(self) -> dict:
+        """Fetch data from API."""
+        # The client renews an expired or rejected token on its own, and
+        # shares one login between the concurrent fetches
+        results = await asyncio.gather(
+            *(
+                self.api.fetch_doors(
+                    community["id"],
+                    community["card_no"],
+                    self.page_size,
+                    known=self._doors.get(community["id"]),
+                )
+                for community in self.communities
+            ),
+            return_exceptions=True,
+        )
+
+        changed = False
+        failed = set()
+        for community, doors in zip(self.communities, results):
+            if isinstance(doors, Exception):
+                _LOGGER.error(
+                    "Get doors error for community %s: %s", community["id"], doors
+                )
+                failed.add(community["id"])
+            elif isinstance(doors, BaseException):
+                raise doors
+            elif doors is not self._doors.get(community["id"]):
+                # An empty list is a community without doors, not a failure
+                self._doors[community["id"]] = doors
+                changed = True
+
+        if len(failed) == len(self.communities):
+            raise UpdateFailed(f"Could not fetch the doors of {sorted(failed)}")
+        if failed:
+            _LOGGER.warning(
+                "Could not fetch the doors of communities %s, keeping their last list",
+                sorted(failed),
+            )
+
+        if not changed:
+            # Byte-identical responses: nothing to parse, cache or update
+            self._async_back_off()
+            return self.data
+
+        # Communities that failed this time keep the doors they had
+        data = {
+            door_id: door
+            for door_id, door in (self.data or {}).items()
+            if door.community_id in failed
+        }
+        for community_id, doors in self._doors.items():
+            if community_id not in failed:
+                for door in doors:
+                    data[door.id] = door
+
+        if data == self.data:
+            self._async_back_off()
+            return self.data
+
+        self.update_interval = self._fast_interval
+        await self.cache.async_update(doors=list(data.values()))
+        return data
+
+    @callback
+    def _async_back_off(self) -> None:
+        """Double the poll interval after an unchanged poll."""
+        self.update_interval = min(self.update_interval * 2, self._max_interval)
@@ -0,0 +1,57 @@
+"""Diagnostics support for HiLife Door."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_PASSWORD,
+    CONF_PHONE,
+    CONF_USER_ID,
+    CONF_WEBHOOK_ID,
+    CONF_WEBHOOK_SECRET,
+    DOMAIN,
+)
+
+TO_REDACT = {
+    CONF_PASSWORD,
+    CONF_PHONE,
+    CONF_USER_ID,
+    CONF_WEBHOOK_ID,
+    CONF_WEBHOOK_SECRET,
+    "card_no",
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    api = data["api"]
+    coordinator = data["coordinator"]
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "doors": len(coordinator.data or {}),
+        "last_update_success": coordinator.last_update_success,
+        "token": {
+            "valid": not api.tokens.expired,
+            "has_refresh_token": api.tokens.refresh_token is not None,
+        },
+        "circuits": {
+            host: {"state": breaker.state, "failures": breaker.failures}
+            for host, breaker in api.breakers.items()
+        },
+        "startup_ms": {
+            key: round(value * 1000, 1) if isinstance(value, float) else value
+            for key, value in data["startup"].items()
+        },
+        "connection_warm": api.connection_warm,
+        "last_open_timing": api.last_open_timing,
+        "metrics": api.metrics.as_dict(),
+        "queues": api.scheduler.as_dict(),
+        "history": async_redact_data(list(data["history"].records), TO_REDACT),
+    }
@@ -0,0 +1,160 @@
+"""Door open history for the HiLife Door integration."""
+import logging
+from collections import deque
+from typing import Callable, Optional
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import CALLBACK_TYPE, Context, Event, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    EVENT_DOOR_OPENED,
+    HISTORY_ORIGINS,
+    HISTORY_SAVE_DELAY,
+    HISTORY_SIZE,
+    STORAGE_VERSION,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Events automations and scripts fire with the context of each run
+ORIGIN_EVENTS = ("automation_triggered", "script_started")
+
+
+class OpenHistory:
+    """The last ``HISTORY_SIZE`` open attempts of one config entry.
+
+    Records are kept in a ring buffer along with the last record of each
+    door, so memory is bounded by the number of doors no matter how long
+    Home Assistant runs. Writes to disk are batched with a delayed save.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, size: int = HISTORY_SIZE):
+        """Initialize the history."""
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.history")
+        self.records: deque = deque(maxlen=size)
+        self.last: dict = {}
+        self._listeners: dict = {}
+        # context id -> automation or script, oldest first
+        self._origins: dict = {}
+        self._dirty = False
+
+    async def async_load(self) -> None:
+        """Load the saved history."""
+        data: Optional[dict] = await self._store.async_load()
+        if not data:
+            return
+        self.records.extend(data.get("records", []))
+        self.last = data.get("last", {})
+
+    @callback
+    def async_add_listener(
+        self, door_id, update_callback: Callable[[dict], None]
+    ) -> CALLBACK_TYPE:
+        """Call ``update_callback`` with every new record of ``door_id``."""
+        key = str(door_id)
+        self._listeners.setdefault(key, []).append(update_callback)
+
+        def remove() -> None:
+            self._listeners[key].remove(update_callback)
+            if not self._listeners[key]:
+                del self._listeners[key]
+
+        return remove
+
+    @callback
+    def async_track_origins(self) -> CALLBACK_TYPE:
+        """Remember the automation or script run behind each context.
+
+        Automations and scripts fire an event with the context of the run,
+        and the services they call share it or descend from it, so an open
+        is attributed with a lookup instead of a scan of their states.
+        """
+
+        @callback
+        def async_run_started(event: Event) -> None:
+            entity_id = event.data.get(ATTR_ENTITY_ID)
+            if entity_id is None:
+                return
+            self._origins[event.context.id] = entity_id
+            if len(self._origins) > HISTORY_ORIGINS:
+                del self._origins[next(iter(self._origins))]
+
+        removers = [
+            self._hass.bus.async_listen(event_type, async_run_started)
+            for event_type in ORIGIN_EVENTS
+        ]
+
+        def remove() -> None:
+            for remover in removers:
+                remover()
+
+        return remove
+
+    @callback
+    def _async_origin(self, context: Optional[Context]) -> Optional[str]:
+        """Return the automation or script whose run created ``context``."""
+        if context is None:
+            return None
+        return self._origins.get(context.id) or self._origins.get(
+            context.parent_id
+        )
+
+    @callback
+    def async_record(
+        self,
+        door_id,
+        name: str,
+        entity_id: Optional[str],
+        result: dict,
+        elapsed: float,
+        context: Optional[Context] = None,
+    ) -> dict:
+        """Record one open attempt and announce it on the event bus."""
+        record = {
+            "time": dt_util.utcnow().isoformat(),
+            "door_id": door_id,
+            "name": name,
+            "entity_id": entity_id,
+            "success": result.get("status") == 1,
+            "status": result.get("status"),
+            "msg": result.get("msg"),
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "user_id": context.user_id if context else None,
+            "context_id": context.id if context else None,
+            "origin": self._async_origin(context),
+        }
+        self.records.append(record)
+        self.last[str(door_id)] = record
+        self._dirty = True
+        self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+        self._hass.bus.async_fire(EVENT_DOOR_OPENED, record, context=context)
+        for update_callback in list(self._listeners.get(str(door_id), ())):
+            update_callback(record)
+        return record
+
+    @callback
+    def async_forget(self, door_id) -> None:
+        """Drop the last record of a door that no longer exists."""
+        if self.last.pop(str(door_id), None) is not None:
+            self._dirty = True
+            self._store.async_delay_save(self._data_to_save, HISTORY_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        """Return the data to write."""
+        self._dirty = False
+        return {"records": list(self.records), "last": self.last}
+
+    async def async_flush(self) -> None:
+        """Write pending records now, e.g. when the entry is unloaded."""
+        if self._dirty:
+            await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the history file."""
+        await self._store.async_remove()
@@ -0,0 +1,127 @@
+"""Door lookup index for the HiLife Door integration."""
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+from .models import Door
+
+# Whitespace and punctuation are ignored when matching names
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize(name) -> str:
+    """Return the form a door name or query is matched in."""
+    return _SEPARATORS.sub("", unicodedata.normalize("NFKC", str(name)).casefold())
+
+
+def pinyin_forms(name: str) -> tuple:
+    """Return the full pinyin and the pinyin initials of a name.
+
+    Empty when the name has no Chinese. pypinyin loads its dictionaries
+    when imported, so that only happens once a door is indexed.
+    """
+    from pypinyin import lazy_pinyin
+
+    syllables = [normalize(syllable) for syllable in lazy_pinyin(str(name))]
+    full = "".join(syllables)
+    if not full or full == normalize(name):
+        return ()
+    return full, "".join(syllable[:1] for syllable in syllables)
+
+
+class DoorIndex:
+    """Find doors of every config entry by name, pinyin, prefix or id.
+
+    Each door is indexed under its ``msDoorId`` and row id, its
+    normalized name, its full pinyin and its pinyin initials; every
+    shorter prefix of the last three is indexed as a prefix. Lookups are
+    dictionary hits. The index is updated per entry with the coordinator
+    data, only touching doors that changed.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        # key -> {(entry_id, msDoorId)}
+        self._exact: dict = {}
+        self._prefix: dict = {}
+        # (entry_id, msDoorId) -> (door, exact keys, prefix keys)
+        self._doors: dict = {}
+        self._entries: dict = {}
+
+    def __len__(self) -> int:
+        """Return the number of indexed doors."""
+        return len(self._doors)
+
+    def update(self, entry_id: str, doors: dict) -> None:
+        """Index the doors of an entry, given as ``msDoorId`` -> ``Door``."""
+        current = self._entries.setdefault(entry_id, set())
+        for door_id in current - doors.keys():
+            self._remove((entry_id, door_id))
+        for door_id, door in doors.items():
+            key = (entry_id, door_id)
+            indexed = self._doors.get(key)
+            if indexed is not None:
+                if indexed[0] is door or indexed[0] == door:
+                    continue
+                self._remove(key)
+            self._add(key, door)
+        current.clear()
+        current.update(doors)
+
+    def remove_entry(self, entry_id: str) -> None:
+        """Drop every door of an entry."""
+        for door_id in self._entries.pop(entry_id, ()):
+            self._remove((entry_id, door_id))
+
+    def _add(self, key: tuple, door: Door) -> None:
+        """Index one door."""
+        name = normalize(door.name or "")
+        forms = pinyin_forms(door.name or "")
+        exact = {str(door.id), name, *forms}
+        if door.door_id is not None:
+            exact.add(str(door.door_id))
+        prefixes = {
+            form[:length]
+            for form in (name, *forms)
+            for length in range(1, len(form))
+        } - exact
+        exact.discard("")
+        for index, keys in ((self._exact, exact), (self._prefix, prefixes)):
+            for form in keys:
+                index.setdefault(form, set()).add(key)
+        self._doors[key] = (door, exact, prefixes)
+
+    def _remove(self, key: tuple) -> None:
+        """Drop one door from the index."""
+        door, exact, prefixes = self._doors.pop(key)
+        for index, keys in ((self._exact, exact), (self._prefix, prefixes)):
+            for form in keys:
+                matches = index[form]
+                matches.discard(key)
+                if not matches:
+                    del index[form]
+
+    def resolve(self, query, entry_ids: Optional[Iterable[str]] = None) -> list:
+        """Return the (entry id, door) pairs that best match ``query``.
+
+        An id, a name or its pinyin matching in full beats a prefix.
+        Several results mean the query is ambiguous.
+        """
+        if entry_ids is not None:
+            entry_ids = set(entry_ids)
+        text = normalize(query)
+        pinyin = None
+        for index in (self._exact, self._prefix):
+            for form in (text, pinyin):
+                if form is None:
+                    # Only converted when the text itself did not match
+                    form = pinyin = (pinyin_forms(query) or ("",))[0]
+                matches = [
+                    key
+                    for key in index.get(form, ())
+                    if entry_ids is None or key[0] in entry_ids
+                ]
+                if matches:
+                    matches.sort(key=str)
+                    return [(key[0], self._doors[key][0]) for key in matches]
+        return []
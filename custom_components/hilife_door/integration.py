@@ -0,0 +1,251 @@
+"""Set up the HiLife Door integration in Home Assistant."""
+import time
+
+# Reported in the diagnostics, to measure startup cost on real hardware
+IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+import logging
+import random
+
+import voluptuous as vol
+
+from homeassistant.components import persistent_notification
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    CONF_ACCOUNTS,
+    CONF_PASSWORD,
+    CONF_PHONE,
+    CONF_USER_ID,
+    DATA_INDEX,
+    DOMAIN,
+    POLL_START_JITTER,
+    SETUP_RETRY_DELAY,
+    SETUP_RETRY_MAX_DELAY,
+)
+from .cache import DoorCache
+from .community import (
+    async_update_devices,
+    community_device_info,
+    entry_communities,
+)
+from .coordinator import HiLifeDoorCoordinator
+from .history import OpenHistory
+from .index import DoorIndex
+from .onboarding import async_import_accounts
+from .registry import (
+    async_acquire_client,
+    async_pop_handoff,
+    async_release_client,
+)
+from .services import async_setup_services
+from .webhook import WebhookTokens, async_register_webhook
+
+_LOGGER = logging.getLogger(__name__)
+
+IMPORT_TIME = time.perf_counter() - IMPORT_STARTED
+
+PLATFORMS = [Platform.LOCK, Platform.SENSOR]
+
+# Accounts listed in configuration.yaml are imported as config entries
+CONFIG_SCHEMA = vol.Schema(
+    {
+        DOMAIN: vol.Schema(
+            {
+                vol.Required(CONF_ACCOUNTS): vol.All(
+                    cv.ensure_list,
+                    [
+                        vol.Schema(
+                            {
+                                vol.Required(CONF_PHONE): cv.string,
+                                vol.Required(CONF_PASSWORD): cv.string,
+                                vol.Required(CONF_USER_ID): cv.string,
+                            }
+                        )
+                    ],
+                )
+            }
+        )
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the HiLife Door services and import configured accounts."""
+    async_setup_services(hass)
+    if DOMAIN in config:
+        hass.async_create_task(
+            _async_import_yaml(hass, config[DOMAIN][CONF_ACCOUNTS]),
+            f"{DOMAIN}_import",
+        )
+    return True
+
+
+async def _async_import_yaml(hass: HomeAssistant, accounts: list) -> None:
+    """Import the accounts of configuration.yaml and report failures."""
+    report = await async_import_accounts(hass, accounts)
+    if not report["failed"]:
+        return
+    for failure in report["failed"]:
+        _LOGGER.error(
+            "Could not import account %s: %s", failure[CONF_PHONE], failure["error"]
+        )
+    persistent_notification.async_create(
+        hass,
+        "以下账号导入失败：\n"
+        + "\n".join(
+            f"- {failure[CONF_PHONE]}: {failure['error']}"
+            for failure in report["failed"]
+        ),
+        title="HiLife 合生活门禁",
+        notification_id=f"{DOMAIN}_import",
+    )
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up HiLife Door from a config entry."""
+    started = time.perf_counter()
+    hass.data.setdefault(DOMAIN, {})
+
+    # Get the API client shared by all entries of this account, taking
+    # over the config flow's logged-in client for a new entry
+    handoff = async_pop_handoff(hass, entry)
+    api = async_acquire_client(hass, entry, handoff.api if handoff else None)
+
+    communities = entry_communities(entry)
+
+    # Create entities from the cached door list when there is one; the
+    # cloud is only ever contacted in the background
+    cache = DoorCache(hass, entry.entry_id)
+    history = OpenHistory(hass, entry.entry_id)
+    cached, _ = await asyncio.gather(cache.async_load(), history.async_load())
+    entry.async_on_unload(history.async_track_origins())
+    prefetched = False
+
+    if (
+        not cached
+        and handoff is not None
+        and all(handoff.doors.get(community["id"]) for community in communities)
+    ):
+        # The config flow already fetched everything this entry needs
+        await cache.async_update(
+            doors=[
+                door
+                for community in communities
+                for door in handoff.doors[community["id"]]
+            ],
+            communities=handoff.communities,
+        )
+        prefetched = True
+
+    coordinator = HiLifeDoorCoordinator(hass, entry, api, cache, communities)
+    async_update_devices(hass, entry, communities, cache.doors)
+
+    # Keep the doors of this entry in the index shared by all entries
+    index: DoorIndex = hass.data[DOMAIN].setdefault(DATA_INDEX, DoorIndex())
+    index.update(entry.entry_id, coordinator.data)
+    entry.async_on_unload(
+        coordinator.async_add_sync_listener(
+            lambda: index.update(entry.entry_id, coordinator.data or {})
+        )
+    )
+    entry.async_on_unload(lambda: index.remove_entry(entry.entry_id))
+
+    # Store data
+    hass.data[DOMAIN][entry.entry_id] = data = {
+        "api": api,
+        "coordinator": coordinator,
+        "cache": cache,
+        "history": history,
+        "communities": {community["id"]: community for community in communities},
+        # Built once and shared by every entity of a community
+        "device_info": {
+            community["id"]: community_device_info(entry.entry_id, community)
+            for community in communities
+        },
+        "startup": {"import": IMPORT_TIME, "cached": cached or prefetched},
+        "webhook_tokens": WebhookTokens(),
+    }
+    async_register_webhook(hass, entry, data)
+
+    # Setup platforms; without a cache they start empty and the entities
+    # appear once the first door list arrives
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    # Nothing needs fetching if the config flow has just done it
+    if not prefetched:
+        entry.async_create_background_task(
+            hass,
+            _async_reconcile(
+                api,
+                cache,
+                coordinator,
+                data["startup"],
+                started,
+                # Entities from the cache can wait; spread the first poll
+                # of entries that start together, e.g. after a restart
+                POLL_START_JITTER if coordinator.data else 0,
+            ),
+            f"{DOMAIN}_reconcile",
+        )
+
+    data["startup"]["setup"] = time.perf_counter() - started
+    return True
+
+
+async def _async_reconcile(
+    api,
+    cache: DoorCache,
+    coordinator: HiLifeDoorCoordinator,
+    startup: dict,
+    started: float,
+    jitter: float = 0,
+) -> None:
+    """Refresh the doors and cached community metadata from the cloud.
+
+    Without cached doors there are no entities yet, so the coordinator
+    would never poll again; keep retrying until a fetch succeeds, even
+    if it finds no doors.
+    """
+    if jitter:
+        await asyncio.sleep(random.uniform(0, jitter))
+    delay = SETUP_RETRY_DELAY
+    await coordinator.async_refresh()
+    while not coordinator.last_update_success:
+        _LOGGER.warning("Could not fetch the doors yet, retrying in %ds", delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, SETUP_RETRY_MAX_DELAY)
+        await coordinator.async_refresh()
+    startup["doors_ready"] = time.perf_counter() - started
+
+    await cache.async_update(communities=await api.get_communities())
+
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry so changed options take effect."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload a config entry."""
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    
+    if unload_ok:
+        data = hass.data[DOMAIN].pop(entry.entry_id)
+        await data["history"].async_flush()
+        async_release_client(hass, entry)
+
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the door cache and history of a deleted config entry."""
+    await DoorCache(hass, entry.entry_id).async_remove()
+    await OpenHistory(hass, entry.entry_id).async_remove()
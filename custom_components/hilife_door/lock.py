@@ -1,14 +1,21 @@
 """Lock platform for HiLife Door integration."""
+import asyncio
 import logging
-from typing import Any
+import time
+from typing import Any, Optional
 
 from homeassistant.components.lock import LockEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Context, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
+from .const import CONF_UNLOCK_HOLD_TIME, DEFAULT_UNLOCK_HOLD_TIME, DOMAIN
+from .history import OpenHistory
+from .models import Door, OpenDoorRequest
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -20,30 +27,52 @@ async def async_setup_entry(
 ) -> None:
     """Set up HiLife Door lock entities."""
     data = hass.data[DOMAIN][entry.entry_id]
-    
-    api = data["api"]
+
     coordinator = data["coordinator"]
-    doors = data["doors"]
-    community_id = data["community_id"]
-    door_community_id = data["door_community_id"]
-    card_no = data["card_no"]
-
-    entities = []
-    for door in doors:
-        entities.append(
+    history = data["history"]
+    communities = data["communities"]
+    device_info = data["device_info"]
+    hold_time = entry.options.get(CONF_UNLOCK_HOLD_TIME, DEFAULT_UNLOCK_HOLD_TIME)
+
+    entities: dict = data.setdefault("entities", {})
+
+    @callback
+    def _async_sync_entities() -> None:
+        """Add new doors and remove revoked ones after a refresh."""
+        doors = coordinator.data or {}
+
+        new_entities = [
             HiLifeDoorLock(
                 coordinator=coordinator,
-                api=api,
-                door_id=door["id"],
-                door_name=door["name"],
-                community_id=community_id,
-                door_community_id=door_community_id,
-                card_no=door.get("card_no", card_no),
-                entry_id=entry.entry_id,
+                history=history,
+                door=door,
+                community=communities[door.community_id],
+                device_info=device_info[door.community_id],
+                hold_time=hold_time,
             )
-        )
-
-    async_add_entities(entities)
+            for door_id, door in doors.items()
+            if door_id not in entities
+        ]
+        for entity in new_entities:
+            entities[entity.door_id] = entity
+
+        removed = [door_id for door_id in entities if door_id not in doors]
+        if removed:
+            entity_registry = er.async_get(hass)
+            for door_id in removed:
+                entity = entities.pop(door_id)
+                history.async_forget(door_id)
+                _LOGGER.info("Door %s was revoked, removing it", entity.name)
+                if entity.registry_entry is not None:
+                    entity_registry.async_remove(entity.entity_id)
+                else:
+                    hass.async_create_task(entity.async_remove())
+
+        if new_entities:
+            async_add_entities(new_entities)
+
+    _async_sync_entities()
+    entry.async_on_unload(coordinator.async_add_sync_listener(_async_sync_entities))
 
 
 class HiLifeDoorLock(CoordinatorEntity, LockEntity):
@@ -52,40 +81,68 @@ class HiLifeDoorLock(CoordinatorEntity, LockEntity):
     def __init__(
         self,
         coordinator,
-        api,
-        door_id: int,
-        door_name: str,
-        community_id: str,
-        door_community_id: str,
-        card_no: str,
-        entry_id: str,
+        history: OpenHistory,
+        door: Door,
+        community: dict,
+        device_info: DeviceInfo,
+        hold_time: float = DEFAULT_UNLOCK_HOLD_TIME,
     ):
-        """Initialize the lock."""
+        """Initialize the lock.
+
+        ``door``, ``community`` and ``device_info`` are shared with the
+        coordinator and the other entities, not copied.
+        """
         super().__init__(coordinator)
-        
-        self._api = api
-        self._door_id = door_id
-        self._door_name = door_name
-        self._community_id = community_id
-        self._door_community_id = door_community_id
-        self._card_no = card_no
-        self._entry_id = entry_id
-        
-        self._attr_unique_id = f"hilife_door_{door_id}"
-        self._attr_name = door_name
+
+        self._history = history
+        self._door = door
+        self._community = community
+
+        self._open_payload = self._build_open_payload()
+
+        self._attr_unique_id = f"hilife_door_{door.id}"
+        self._attr_name = door.name
+        self._attr_device_info = device_info
         self._attr_is_locked = True  # Doors are always "locked"
         self._attr_is_locking = False
         self._attr_is_unlocking = False
+        self._hold_time = hold_time
+        self._pending_open: Optional[asyncio.Task] = None
+        self._cancel_relock: Optional[CALLBACK_TYPE] = None
+        # Availability follows the coordinator's last update
+        self._written_available = coordinator.last_update_success
+
+    def _build_open_payload(self) -> OpenDoorRequest:
+        """Build the openDoor request body once, off the unlock path."""
+        door = self._door
+        return self.coordinator.api.build_open_door_payload(
+            door.id,
+            door.name,
+            self._community["id"],
+            self._community["door_community_id"],
+            door.card_no or self._community["card_no"],
+        )
 
     @property
-    def device_info(self):
-        """Return device info."""
-        return {
-            "identifiers": {(DOMAIN, str(self._door_id))},
-            "name": self._door_name,
-            "manufacturer": "HiLife 合生活",
-            "model": "Smart Door",
-        }
+    def door_id(self):
+        """Return the msDoorId of this door."""
+        return self._door.id
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only if this door's data or availability changed."""
+        door = (self.coordinator.data or {}).get(self._door.id)
+        changed = not (door is None or door is self._door or door == self._door)
+        available = self.available
+        if not changed and available == self._written_available:
+            return
+
+        if changed:
+            self._door = door
+            self._attr_name = door.name
+            self._open_payload = self._build_open_payload()
+        self._written_available = available
+        self.async_write_ha_state()
 
     @property
     def is_locked(self) -> bool:
@@ -99,46 +156,81 @@ class HiLifeDoorLock(CoordinatorEntity, LockEntity):
 
     async def async_unlock(self, **kwargs: Any) -> None:
         """Unlock the device (open the door)."""
+        await self.async_open_door()
+
+    async def async_open_door(self, context: Optional[Context] = None) -> dict:
+        """Open the door and return the raw cloud result.
+
+        Returns as soon as the cloud answers. Taps that arrive while an
+        open request for this door is in flight share its result.
+        ``context`` is the caller's, recorded in the open history; it
+        defaults to the context of the service call being handled.
+        """
+        if self._pending_open is None or self._pending_open.done():
+            self._pending_open = self.hass.async_create_task(
+                self._async_send_open(context or self._context)
+            )
+        return await asyncio.shield(self._pending_open)
+
+    async def _async_send_open(self, context: Optional[Context]) -> dict:
+        """Send the open request, update the lock state and record it."""
         self._attr_is_unlocking = True
         self.async_write_ha_state()
 
+        start = time.monotonic()
         try:
-            result = await self.hass.async_add_executor_job(
-                self._api.open_door,
-                self._door_id,
-                self._door_name,
-                self._community_id,
-                self._door_community_id,
-                self._card_no,
-            )
+            result = await self.coordinator.api.open_door_payload(self._open_payload)
+            # Doors change around the time they are used (and a refused
+            # open may be a revoked door), so check the list again soon
+            self.coordinator.async_poll_soon()
 
             if result.get("status") == 1:
-                _LOGGER.info("Door %s opened successfully", self._door_name)
-                # Temporarily show as unlocked
+                _LOGGER.info("Door %s opened successfully", self._door.name)
+                # Show as unlocked for the hold time, extending the timer
+                # if the door is opened again before it runs out
                 self._attr_is_locked = False
-                self.async_write_ha_state()
-                
-                # Reset to locked after 3 seconds
-                await self._async_reset_lock_state()
+                if self._cancel_relock is not None:
+                    self._cancel_relock()
+                self._cancel_relock = async_call_later(
+                    self.hass, self._hold_time, self._async_relock
+                )
             else:
                 _LOGGER.error(
                     "Failed to open door %s: %s",
-                    self._door_name,
+                    self._door.name,
                     result.get("msg", "Unknown error")
                 )
         except Exception as e:
-            _LOGGER.error("Error opening door %s: %s", self._door_name, e)
+            _LOGGER.error("Error opening door %s: %s", self._door.name, e)
+            result = {"status": -1, "msg": str(e)}
         finally:
             self._attr_is_unlocking = False
             self.async_write_ha_state()
 
-    async def _async_reset_lock_state(self):
-        """Reset lock state after a delay."""
-        import asyncio
-        await asyncio.sleep(3)
+        self._history.async_record(
+            self._door.id,
+            self._door.name,
+            self.entity_id,
+            result,
+            time.monotonic() - start,
+            context,
+        )
+        return result
+
+    @callback
+    def _async_relock(self, _now) -> None:
+        """Show the door as locked again once the hold time is over."""
+        self._cancel_relock = None
         self._attr_is_locked = True
         self.async_write_ha_state()
 
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the pending relock."""
+        if self._cancel_relock is not None:
+            self._cancel_relock()
+            self._cancel_relock = None
+        await super().async_will_remove_from_hass()
+
     async def async_open(self, **kwargs: Any) -> None:
         """Open the door (same as unlock)."""
         await self.async_unlock(**kwargs)
@@ -0,0 +1,157 @@
+"""Latency and outcome metrics for the HiLife Door API client."""
+import time
+from bisect import bisect_left
+from typing import Callable
+
+from .const import (
+    METRICS_MAX_MESSAGES,
+    METRICS_SLOT_SECONDS,
+    METRICS_WINDOW_SLOTS,
+)
+
+# Upper bounds of the latency buckets in milliseconds; one more bucket
+# catches everything slower
+LATENCY_BUCKETS = (
+    10, 25, 50, 75, 100, 150, 200, 300, 400, 500, 750,
+    1000, 1500, 2000, 3000, 5000, 7500, 10000, 20000, 30000,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram over a rolling time window.
+
+    The window is a ring of ``slots`` sub-histograms of ``slot_seconds``
+    each. All counters are allocated up front and stale slots are zeroed
+    in place, so recording never allocates.
+    """
+
+    def __init__(
+        self,
+        slots: int = METRICS_WINDOW_SLOTS,
+        slot_seconds: int = METRICS_SLOT_SECONDS,
+    ):
+        """Initialize the histogram."""
+        self._slot_seconds = slot_seconds
+        self._counts = [[0] * (len(LATENCY_BUCKETS) + 1) for _ in range(slots)]
+        self._epochs = [-1] * slots
+
+    def record(self, milliseconds: float) -> None:
+        """Add one sample."""
+        epoch = int(time.monotonic() // self._slot_seconds)
+        index = epoch % len(self._epochs)
+        counts = self._counts[index]
+        if self._epochs[index] != epoch:
+            for bucket in range(len(counts)):
+                counts[bucket] = 0
+            self._epochs[index] = epoch
+        counts[bisect_left(LATENCY_BUCKETS, milliseconds)] += 1
+
+    def _window(self) -> list:
+        """Sum the slots that are still inside the window."""
+        oldest = int(time.monotonic() // self._slot_seconds) - len(self._epochs)
+        totals = [0] * (len(LATENCY_BUCKETS) + 1)
+        for epoch, counts in zip(self._epochs, self._counts):
+            if epoch > oldest:
+                for bucket, count in enumerate(counts):
+                    totals[bucket] += count
+        return totals
+
+    def percentiles(self, *quantiles: float) -> dict:
+        """Return the bucket upper bound for each quantile, in ms.
+
+        Samples in the overflow bucket are reported as ``None``.
+        """
+        totals = self._window()
+        samples = sum(totals)
+        result = {}
+        for quantile in quantiles:
+            if not samples:
+                result[quantile] = None
+                continue
+            rank = quantile * samples
+            seen = 0
+            for bucket, count in enumerate(totals):
+                seen += count
+                if seen >= rank:
+                    break
+            result[quantile] = (
+                LATENCY_BUCKETS[bucket] if bucket < len(LATENCY_BUCKETS) else None
+            )
+        return result
+
+
+class EndpointMetrics:
+    """Call counters and latency histogram of one endpoint."""
+
+    def __init__(self):
+        """Initialize the metrics."""
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.failures_by_status: dict = {}
+        self.failures_by_msg: dict = {}
+        self.latency = LatencyHistogram()
+        self._listeners: list = []
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call ``listener`` after every recorded call, return a remover."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def record(self, seconds: float, status, msg=None) -> None:
+        """Record one call; ``status == 1`` is the cloud's success code."""
+        self.calls += 1
+        self.latency.record(seconds * 1000)
+        if status == 1:
+            self.successes += 1
+        else:
+            self.failures += 1
+            self.failures_by_status[status] = self.failures_by_status.get(status, 0) + 1
+            if msg is not None:
+                if (
+                    msg not in self.failures_by_msg
+                    and len(self.failures_by_msg) >= METRICS_MAX_MESSAGES
+                ):
+                    msg = "other"
+                self.failures_by_msg[msg] = self.failures_by_msg.get(msg, 0) + 1
+
+        for listener in list(self._listeners):
+            listener()
+
+    def as_dict(self) -> dict:
+        """Return a snapshot of the metrics."""
+        percentiles = self.latency.percentiles(0.5, 0.95, 0.99)
+        return {
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "failures_by_status": {
+                str(status): count
+                for status, count in self.failures_by_status.items()
+            },
+            "failures_by_msg": dict(self.failures_by_msg),
+            "latency_ms": {
+                "p50": percentiles[0.5],
+                "p95": percentiles[0.95],
+                "p99": percentiles[0.99],
+            },
+        }
+
+
+class ApiMetrics:
+    """Metrics of every endpoint of one API client."""
+
+    def __init__(self, endpoints):
+        """Initialize the metrics."""
+        self.endpoints = {endpoint: EndpointMetrics() for endpoint in endpoints}
+
+    def record(self, endpoint: str, seconds: float, status, msg=None) -> None:
+        """Record one call to ``endpoint``."""
+        self.endpoints[endpoint].record(seconds, status, msg)
+
+    def as_dict(self) -> dict:
+        """Return a snapshot of all endpoints."""
+        return {
+            endpoint: metrics.as_dict()
+            for endpoint, metrics in self.endpoints.items()
+        }
@@ -0,0 +1,56 @@
+"""Data models for the HiLife Door integration."""
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Optional
+
+
+@dataclass(frozen=True, slots=True)
+class Door:
+    """A door the account can open.
+
+    One immutable instance per door is shared by the API parser, the
+    coordinator data, the cache and the entities.
+    """
+
+    id: Any  # msDoorId
+    name: str
+    door_id: Any = None  # row id of the door in getDoors
+    card_no: Optional[str] = None
+    community_id: Any = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Door":
+        """Create a door from its stored form, ignoring unknown keys."""
+        return cls(**{key: data[key] for key in _FIELD_NAMES if key in data})
+
+    def as_dict(self) -> dict:
+        """Return the door in a form that can be stored as JSON."""
+        return asdict(self)
+
+
+_FIELD_NAMES = tuple(field.name for field in fields(Door))
+
+
+@dataclass(frozen=True, slots=True)
+class Community:
+    """A community the account holds a card for."""
+
+    id: Any  # communityId
+    name: str
+    door_community_id: Any = None
+    card_no: Optional[str] = None
+
+    def as_dict(self) -> dict:
+        """Return the community in the form config entries store it."""
+        return asdict(self)
+
+
+@dataclass(frozen=True, slots=True)
+class OpenDoorRequest:
+    """The openDoor request of one door, serialized once.
+
+    The body only depends on the door and the account, so it is built
+    when the door is set up and sent as is on every open.
+    """
+
+    door_id: Any
+    body: bytes
@@ -0,0 +1,180 @@
+"""Bulk import of many HiLife accounts at once."""
+import asyncio
+import csv
+import logging
+from dataclasses import dataclass, field
+from typing import Optional
+
+from homeassistant.config_entries import SOURCE_IMPORT
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import HiLifeApiError, HiLifeAsyncApi
+from .const import (
+    BULK_IMPORT_CONCURRENCY,
+    CONF_COMMUNITIES,
+    CONF_PASSWORD,
+    CONF_PHONE,
+    CONF_USER_ID,
+    DOMAIN,
+)
+from .registry import account_key, async_store_handoff
+
+_LOGGER = logging.getLogger(__name__)
+
+ACCOUNT_FIELDS = (CONF_PHONE, CONF_PASSWORD, CONF_USER_ID)
+
+
+@dataclass
+class Discovery:
+    """What logging in and listing one account found."""
+
+    account: dict
+    api: Optional[HiLifeAsyncApi] = None
+    communities: list = field(default_factory=list)
+    # community id -> doors; [] where the list failed and setup retries
+    doors: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def parse_accounts_csv(text: str) -> list:
+    """Return the accounts of a CSV with a phone,password,user_id header.
+
+    Raises ValueError if a column is missing.
+    """
+    reader = csv.DictReader(text.splitlines())
+    missing = set(ACCOUNT_FIELDS) - set(reader.fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+    return [
+        {key: (row.get(key) or "").strip() for key in ACCOUNT_FIELDS}
+        for row in reader
+        if any(row.values())
+    ]
+
+
+async def async_discover_account(
+    api: HiLifeAsyncApi, account: dict
+) -> Discovery:
+    """Log in and fetch every community and door list of one account.
+
+    Never raises, so one account cannot fail the others; the client is
+    closed unless the account was discovered.
+    """
+    try:
+        await api.authenticate()
+        communities = await api.fetch_communities()
+    except Exception as err:
+        if not isinstance(err, HiLifeApiError):
+            _LOGGER.exception("Unexpected error discovering %s", api.phone)
+        api.close()
+        return Discovery(account, error=str(err) or type(err).__name__)
+    if not communities:
+        api.close()
+        return Discovery(account, error="no communities")
+
+    door_lists = await asyncio.gather(
+        *(
+            api.fetch_doors(community.id, community.card_no)
+            for community in communities
+        ),
+        return_exceptions=True,
+    )
+    return Discovery(
+        account,
+        api,
+        [community.as_dict() for community in communities],
+        {
+            community.id: [] if isinstance(doors, BaseException) else doors
+            for community, doors in zip(communities, door_lists)
+        },
+    )
+
+
+async def async_import_accounts(hass: HomeAssistant, accounts: list) -> dict:
+    """Validate accounts concurrently and create an entry for each.
+
+    Accounts that already have an entry are skipped without logging in.
+    The others log in and discover their communities and doors
+    ``BULK_IMPORT_CONCURRENCY`` at a time on Home Assistant's shared
+    connection pool. Each account that succeeds gets an entry covering
+    all of its communities, which starts from the fetched doors.
+    Returns the phones created and skipped and the errors of the others.
+    """
+    configured = {
+        account_key(entry.data[CONF_PHONE], entry.data[CONF_USER_ID])
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    }
+    report: dict = {"created": [], "skipped": [], "failed": []}
+    pending: dict = {}
+    for account in accounts:
+        missing = [key for key in ACCOUNT_FIELDS if not account.get(key)]
+        if missing:
+            report["failed"].append(
+                {
+                    CONF_PHONE: account.get(CONF_PHONE),
+                    "error": f"missing {', '.join(missing)}",
+                }
+            )
+            continue
+        key = account_key(account[CONF_PHONE], account[CONF_USER_ID])
+        if key in configured or key in pending:
+            report["skipped"].append(account[CONF_PHONE])
+            continue
+        pending[key] = account
+
+    session = async_get_clientsession(hass, verify_ssl=False)
+    semaphore = asyncio.Semaphore(BULK_IMPORT_CONCURRENCY)
+
+    async def discover(account: dict) -> Discovery:
+        async with semaphore:
+            return await async_discover_account(
+                HiLifeAsyncApi(
+                    session,
+                    account[CONF_PHONE],
+                    account[CONF_PASSWORD],
+                    account[CONF_USER_ID],
+                ),
+                account,
+            )
+
+    discoveries = await asyncio.gather(
+        *(discover(account) for account in pending.values())
+    )
+
+    phones, flows = [], []
+    for discovery in discoveries:
+        phone = discovery.account[CONF_PHONE]
+        if discovery.error is not None:
+            report["failed"].append({CONF_PHONE: phone, "error": discovery.error})
+            continue
+        async_store_handoff(
+            hass, discovery.api, discovery.doors, discovery.communities
+        )
+        flows.append(
+            hass.config_entries.flow.async_init(
+                DOMAIN,
+                context={"source": SOURCE_IMPORT},
+                data={
+                    **{key: discovery.account[key] for key in ACCOUNT_FIELDS},
+                    CONF_COMMUNITIES: discovery.communities,
+                },
+            )
+        )
+        phones.append(phone)
+
+    for phone, result in zip(phones, await asyncio.gather(*flows)):
+        if result["type"] == FlowResultType.CREATE_ENTRY:
+            report["created"].append(phone)
+        else:
+            # An entry for the account was added in the meantime
+            report["skipped"].append(phone)
+
+    _LOGGER.info(
+        "Imported %d accounts, skipped %d, %d failed",
+        len(report["created"]),
+        len(report["skipped"]),
+        len(report["failed"]),
+    )
+    return report
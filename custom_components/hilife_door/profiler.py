@@ -0,0 +1,302 @@
+"""On-demand profiling of the HiLife Door integration."""
+import asyncio
+import cProfile
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, PROFILE_MAX_CALLS, PROFILE_SAMPLE_INTERVAL
+from .coordinator import HiLifeDoorCoordinator
+from .lock import HiLifeDoorLock
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _describe_setup(args) -> dict:
+    """Describe an entry setup call."""
+    return {"entry": args[1].title}
+
+
+def _describe_refresh(args) -> dict:
+    """Describe a coordinator refresh call."""
+    return {"coordinator": args[0].name}
+
+
+def _describe_open(args) -> dict:
+    """Describe a door open, with the stages the API client timed."""
+    entity = args[0]
+    timing = entity.coordinator.api.last_open_timing
+    return {
+        "entity_id": entity.entity_id,
+        "warm": timing.get("warm"),
+        **{
+            f"{stage}_ms": round(timing[stage] * 1000, 1)
+            for stage in ("queue", "request", "read")
+            if stage in timing
+        },
+    }
+
+
+def _targets() -> list:
+    """Return the (label, owner, attribute, describe) of each profiled call.
+
+    Home Assistant looks ``async_setup_entry`` up on the package, so that
+    is where setups are caught.
+    """
+    return [
+        ("setup", sys.modules[__package__], "async_setup_entry", _describe_setup),
+        ("refresh", HiLifeDoorCoordinator, "_async_update_data", _describe_refresh),
+        ("open_door", HiLifeDoorLock, "_async_send_open", _describe_open),
+    ]
+
+
+class _StepTimer:
+    """Await a coroutine, timing each step it runs on the event loop.
+
+    A step lasts from when the loop resumes the coroutine until it
+    suspends again, so the sum of the steps is the time the call kept
+    the loop busy and the rest was spent waiting.
+    """
+
+    __slots__ = ("_coro", "busy", "longest", "steps")
+
+    def __init__(self, coro):
+        """Initialize the timer."""
+        self._coro = coro
+        self.busy = 0.0
+        self.longest = 0.0
+        self.steps = 0
+
+    def _add(self, seconds: float) -> None:
+        self.busy += seconds
+        self.longest = max(self.longest, seconds)
+        self.steps += 1
+
+    def __await__(self):
+        coro = self._coro
+        send, message = coro.send, None
+        while True:
+            start = time.perf_counter()
+            try:
+                yielded = send(message)
+            except StopIteration as stop:
+                self._add(time.perf_counter() - start)
+                return stop.value
+            except BaseException:
+                self._add(time.perf_counter() - start)
+                raise
+            self._add(time.perf_counter() - start)
+            try:
+                message = yield yielded
+                send = coro.send
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as err:
+                send, message = coro.throw, err
+
+
+class ProfileSession:
+    """One run of the profile service.
+
+    The profiled calls are wrapped only while the session runs and the
+    original functions are put back when it stops, so nothing of this is
+    left on the hot paths when profiling is off.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        mode: str,
+        max_calls: Optional[int],
+        stall_threshold: float,
+    ):
+        """Initialize the session; ``stall_threshold`` is in seconds."""
+        self._hass = hass
+        self.mode = mode
+        self._max_calls = max_calls
+        self._stall_threshold = stall_threshold
+        self.calls: deque = deque(maxlen=PROFILE_MAX_CALLS)
+        self.summary: dict = {}
+        self.stalls = 0
+        self._count = 0
+        self._active = 0
+        self._done = asyncio.Event()
+        self._originals: list = []
+        self._profile: Optional[cProfile.Profile] = None
+        self._samples: Counter = Counter()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampler = threading.Event()
+        self._started = dt_util.utcnow()
+
+    @callback
+    def start(self) -> None:
+        """Wrap the profiled calls and start the profiler."""
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+        else:
+            self._sampler = threading.Thread(
+                target=self._sample,
+                args=(threading.get_ident(),),
+                name=f"{DOMAIN}_profiler",
+                daemon=True,
+            )
+            self._sampler.start()
+
+        for label, owner, attribute, describe in _targets():
+            original = getattr(owner, attribute)
+            self._originals.append((owner, attribute, original))
+            setattr(owner, attribute, self._wrap(label, original, describe))
+
+    @callback
+    def stop(self) -> None:
+        """Put the original functions back and stop the profiler."""
+        for owner, attribute, original in reversed(self._originals):
+            setattr(owner, attribute, original)
+        self._originals.clear()
+        if self._profile is not None and self._active:
+            self._profile.disable()
+        self._stop_sampler.set()
+
+    async def async_wait(self, duration: float) -> None:
+        """Wait ``duration`` seconds, or until enough calls were profiled."""
+        try:
+            await asyncio.wait_for(self._done.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
+
+    def _wrap(self, label: str, func: Callable, describe: Callable) -> Callable:
+        """Return ``func`` wrapped to be profiled as ``label``."""
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await self._async_profile_call(
+                label, func(*args, **kwargs), args, describe
+            )
+
+        return wrapper
+
+    async def _async_profile_call(self, label: str, coro, args, describe):
+        """Run one profiled call and record its breakdown."""
+        called = dt_util.utcnow()
+        if self._active == 0 and self._profile is not None:
+            self._profile.enable()
+        self._active += 1
+        timer = _StepTimer(coro)
+        start = time.perf_counter()
+        try:
+            return await timer
+        finally:
+            elapsed = time.perf_counter() - start
+            self._active -= 1
+            if self._active == 0 and self._profile is not None:
+                self._profile.disable()
+            self._record(label, called, elapsed, timer, describe(args))
+
+    def _record(
+        self, label: str, called, elapsed: float, timer: _StepTimer, details: dict
+    ) -> None:
+        """Keep the breakdown of one call and warn about a stall."""
+        record = {
+            "time": called.isoformat(),
+            "call": label,
+            **details,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "loop_ms": round(timer.busy * 1000, 1),
+            "wait_ms": round((elapsed - timer.busy) * 1000, 1),
+            "steps": timer.steps,
+            "longest_step_ms": round(timer.longest * 1000, 1),
+        }
+        self.calls.append(record)
+
+        summary = self.summary.setdefault(
+            label, {"calls": 0, "elapsed_ms": 0.0, "loop_ms": 0.0, "stalls": 0}
+        )
+        summary["calls"] += 1
+        summary["elapsed_ms"] += record["elapsed_ms"]
+        summary["loop_ms"] += record["loop_ms"]
+
+        if timer.longest > self._stall_threshold:
+            self.stalls += 1
+            summary["stalls"] += 1
+            _LOGGER.warning(
+                "%s blocked the event loop for %.0f ms in one step: %s",
+                label,
+                timer.longest * 1000,
+                details,
+            )
+
+        self._count += 1
+        if self._max_calls and self._count >= self._max_calls:
+            self._done.set()
+
+    def _sample(self, thread_id: int) -> None:
+        """Record the event loop's stack while a profiled call runs."""
+        while not self._stop_sampler.wait(PROFILE_SAMPLE_INTERVAL):
+            if not self._active:
+                continue
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} "
+                    f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self._samples[";".join(reversed(stack))] += 1
+
+    async def async_save(self) -> dict:
+        """Write the stats and the call breakdowns to the config directory.
+
+        ``cprofile`` stats are a pstats file, ``sample`` stats are
+        collapsed stacks that flame graph tools read.
+        """
+        base = self._hass.config.path(
+            f"{DOMAIN}_profile_{self._started.strftime('%Y%m%d_%H%M%S')}"
+        )
+        stats_path = f"{base}.prof" if self.mode == "cprofile" else f"{base}.txt"
+        calls_path = f"{base}.json"
+        for summary in self.summary.values():
+            summary["elapsed_ms"] = round(summary["elapsed_ms"] / summary["calls"], 1)
+            summary["loop_ms"] = round(summary["loop_ms"] / summary["calls"], 1)
+        result = {
+            "mode": self.mode,
+            "stats": stats_path,
+            "calls": calls_path,
+            "stalls": self.stalls,
+            # Average per call
+            "summary": self.summary,
+        }
+
+        if self._sampler is not None:
+            await self._hass.async_add_executor_job(self._sampler.join)
+
+        def write() -> None:
+            if self._profile is not None:
+                self._profile.dump_stats(stats_path)
+            else:
+                with open(stats_path, "w", encoding="utf-8") as file:
+                    for stack, count in self._samples.most_common():
+                        file.write(f"{stack} {count}\n")
+            with open(calls_path, "w", encoding="utf-8") as file:
+                json.dump(
+                    {**result, "records": list(self.calls)},
+                    file,
+                    ensure_ascii=False,
+                    indent=2,
+                )
+
+        await self._hass.async_add_executor_job(write)
+        _LOGGER.info("Profile written to %s and %s", stats_path, calls_path)
+        return result
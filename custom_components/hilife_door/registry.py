@@ -0,0 +1,153 @@
+"""Per-account API client registry for the HiLife Door integration."""
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+
+from .api import HiLifeAsyncApi
+from .const import (
+    CONF_CONNECT_TIMEOUT,
+    CONF_KEEPALIVE_INTERVAL,
+    CONF_PASSWORD,
+    CONF_PHONE,
+    CONF_READ_TIMEOUT,
+    CONF_USER_ID,
+    DATA_ACCOUNTS,
+    DATA_HANDOFFS,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_KEEPALIVE_INTERVAL,
+    DEFAULT_READ_TIMEOUT,
+    DOMAIN,
+    HANDOFF_TTL,
+)
+
+
+@dataclass
+class AccountClient:
+    """An API client shared by every config entry of one account."""
+
+    api: HiLifeAsyncApi
+    entry_ids: set = field(default_factory=set)
+
+
+@dataclass
+class Handoff:
+    """A logged-in client and cloud data the config flow left for setup."""
+
+    api: HiLifeAsyncApi
+    doors: dict
+    communities: list
+    cancel: Optional[Callable[[], None]] = None
+
+
+def account_key(phone: str, user_id: str) -> str:
+    """Return the registry key for an account."""
+    return f"{phone}:{user_id}"
+
+
+@callback
+def async_store_handoff(
+    hass: HomeAssistant,
+    api: HiLifeAsyncApi,
+    doors: dict,
+    communities: list,
+) -> None:
+    """Keep the flow's client and data until the new entry is set up.
+
+    ``doors`` maps community ids to their door lists. The client is
+    closed if no entry claims it within ``HANDOFF_TTL``.
+    """
+    handoffs = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_HANDOFFS, {})
+    key = account_key(api.phone, api.user_id)
+
+    previous = handoffs.pop(key, None)
+    if previous is not None:
+        previous.cancel()
+        previous.api.close()
+
+    handoff = handoffs[key] = Handoff(api, doors, communities)
+
+    @callback
+    def _async_expire(_now) -> None:
+        if handoffs.get(key) is handoff:
+            handoffs.pop(key)
+            handoff.api.close()
+
+    handoff.cancel = async_call_later(hass, HANDOFF_TTL, _async_expire)
+
+
+@callback
+def async_pop_handoff(hass: HomeAssistant, entry: ConfigEntry) -> Optional[Handoff]:
+    """Return and forget what the config flow left for ``entry``, if anything."""
+    handoffs = hass.data[DOMAIN].get(DATA_HANDOFFS, {})
+    handoff = handoffs.pop(
+        account_key(entry.data[CONF_PHONE], entry.data[CONF_USER_ID]), None
+    )
+    if handoff is not None:
+        handoff.cancel()
+    return handoff
+
+
+@callback
+def async_acquire_client(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    adopt: Optional[HiLifeAsyncApi] = None,
+) -> HiLifeAsyncApi:
+    """Return the shared client for the entry's account, creating it if needed.
+
+    ``adopt`` is an already logged-in client, such as the config flow's,
+    to use instead of creating one. It is closed if the account already
+    has a client. The entry's timeouts and keepalive interval are applied
+    to the client either way.
+    """
+    accounts = hass.data[DOMAIN].setdefault(DATA_ACCOUNTS, {})
+    key = account_key(entry.data[CONF_PHONE], entry.data[CONF_USER_ID])
+
+    account = accounts.get(key)
+    if account is None:
+        account = accounts[key] = AccountClient(
+            api=adopt
+            or HiLifeAsyncApi(
+                session=async_get_clientsession(hass, verify_ssl=False),
+                phone=entry.data[CONF_PHONE],
+                password=entry.data[CONF_PASSWORD],
+                user_id=entry.data[CONF_USER_ID],
+            )
+        )
+    else:
+        if adopt is not None:
+            adopt.close()
+        account.api.password = entry.data[CONF_PASSWORD]
+
+    # The client is per account, so the newest entry set up wins if the
+    # stored passwords or connection options have diverged
+    account.api.set_timeouts(
+        entry.options.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+        entry.options.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+    )
+    account.api.start_keepalive(
+        entry.options.get(CONF_KEEPALIVE_INTERVAL, DEFAULT_KEEPALIVE_INTERVAL)
+    )
+
+    account.entry_ids.add(entry.entry_id)
+    return account.api
+
+
+@callback
+def async_release_client(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the entry's reference and close the client after the last one."""
+    accounts = hass.data[DOMAIN].get(DATA_ACCOUNTS, {})
+    key = account_key(entry.data[CONF_PHONE], entry.data[CONF_USER_ID])
+
+    account = accounts.get(key)
+    if account is None:
+        return
+
+    account.entry_ids.discard(entry.entry_id)
+    if not account.entry_ids:
+        account.api.close()
+        accounts.pop(key)
@@ -0,0 +1,154 @@
+"""Retry and circuit breaker helpers for HiLife cloud calls."""
+import asyncio
+import logging
+import random
+import time
+from typing import Callable, NamedTuple, Optional
+
+import aiohttp
+
+from .const import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RECOVERY_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit is open."""
+
+
+class RetryPolicy(NamedTuple):
+    """How often and how patiently to retry a call."""
+
+    attempts: int
+    base_delay: float
+    max_delay: float
+    retry_on: tuple
+
+    def delay(self, attempt: int) -> float:
+        """Return the jittered exponential backoff before ``attempt``."""
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+
+# Reads are idempotent: retry on any transport error or timeout
+READ_RETRY = RetryPolicy(
+    attempts=3,
+    base_delay=0.5,
+    max_delay=4,
+    retry_on=(aiohttp.ClientError, asyncio.TimeoutError),
+)
+
+# Opening a door is not: only retry when the request could not have been
+# delivered (connection refused or a pooled connection that went stale)
+OPEN_RETRY = RetryPolicy(
+    attempts=2,
+    base_delay=0.1,
+    max_delay=0.3,
+    retry_on=(aiohttp.ClientConnectorError, aiohttp.ServerDisconnectedError),
+)
+
+
+class CircuitBreaker:
+    """Fail fast while a host keeps failing.
+
+    After ``failure_threshold`` consecutive failures the circuit opens
+    and calls raise CircuitOpenError without touching the network. After
+    ``recovery_timeout`` seconds calls are let through again (half-open)
+    and the first outcome closes or re-opens the circuit.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout: float = CIRCUIT_RECOVERY_TIMEOUT,
+    ):
+        """Initialize the circuit breaker."""
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._listeners: list = []
+
+    def add_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Call ``listener`` on every state change, return a remover."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if calls to the host should not be made."""
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_timeout:
+                raise CircuitOpenError(f"{self.host} is unavailable")
+            self._set_state(STATE_HALF_OPEN)
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call."""
+        self.failures = 0
+        if self.state != STATE_CLOSED:
+            self._set_state(STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit when needed."""
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or (
+            self.state == STATE_CLOSED and self.failures >= self.failure_threshold
+        ):
+            self.opened_at = time.monotonic()
+            self._set_state(STATE_OPEN)
+
+    def _set_state(self, state: str) -> None:
+        """Change state and notify listeners."""
+        _LOGGER.debug("Circuit for %s: %s -> %s", self.host, self.state, state)
+        if state == STATE_OPEN:
+            _LOGGER.warning(
+                "%s failed %d times, pausing calls for %ds",
+                self.host,
+                self.failures,
+                self.recovery_timeout,
+            )
+        self.state = state
+        for listener in list(self._listeners):
+            listener()
+
+
+async def async_call_with_retry(
+    breaker: CircuitBreaker, policy: RetryPolicy, send
+) -> tuple:
+    """Run ``send`` through the breaker, retrying per ``policy``.
+
+    ``send`` is a coroutine function returning ``(http_status, body)``.
+    Transport errors in ``policy.retry_on`` and HTTP 5xx responses count
+    as failures and are retried with jittered exponential backoff.
+    """
+    attempt = 1
+    while True:
+        breaker.before_call()
+        try:
+            status, body = await send()
+        except policy.retry_on as err:
+            breaker.record_failure()
+            if attempt >= policy.attempts:
+                raise
+            _LOGGER.debug("%s attempt %d failed: %r", breaker.host, attempt, err)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            breaker.record_failure()
+            raise
+        else:
+            if status < 500:
+                breaker.record_success()
+                return status, body
+            breaker.record_failure()
+            if attempt >= policy.attempts:
+                return status, body
+            _LOGGER.debug("%s attempt %d got HTTP %s", breaker.host, attempt, status)
+
+        await asyncio.sleep(policy.delay(attempt))
+        attempt += 1
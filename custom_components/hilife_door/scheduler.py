@@ -0,0 +1,176 @@
+"""Client-side rate limiting of HiLife cloud requests."""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Optional
+
+from .const import ENDPOINT_PRIORITIES, RATE_LIMIT_ACCOUNT, RATE_LIMITS
+from .metrics import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allow ``burst`` requests at once, refilled at ``rate`` per second."""
+
+    def __init__(self, rate: float, burst: int):
+        """Initialize the bucket full."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last call."""
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def available(self, now: float) -> bool:
+        """Return True if a request may go now."""
+        self._refill(now)
+        return self._tokens >= 1
+
+    def take(self) -> None:
+        """Use one token."""
+        self._tokens -= 1
+
+    def delay(self, now: float) -> float:
+        """Return the seconds until the next token."""
+        self._refill(now)
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+
+class QueueStats:
+    """Queue depth and wait times of one endpoint."""
+
+    def __init__(self):
+        """Initialize the statistics."""
+        self.requests = 0
+        self.throttled = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.wait = LatencyHistogram()
+
+    def as_dict(self) -> dict:
+        """Return a snapshot of the statistics."""
+        percentiles = self.wait.percentiles(0.5, 0.95)
+        return {
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "waiting": self.waiting,
+            "max_waiting": self.max_waiting,
+            "wait_ms": {"p50": percentiles[0.5], "p95": percentiles[0.95]},
+        }
+
+
+class RequestScheduler:
+    """Rate limit the requests of one account and order them by priority.
+
+    Every request takes a token from the bucket of its endpoint and from
+    the bucket of the whole account. Requests that cannot go at once
+    wait in one queue ordered by priority, then arrival; whenever tokens
+    are available the first waiter whose endpoint has one goes next, so
+    a door open never waits behind a background poll.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[dict] = None,
+        account_limit: Optional[tuple] = None,
+    ):
+        """Initialize the scheduler, by default with the limits in const."""
+        limits = limits or RATE_LIMITS
+        account_limit = account_limit or RATE_LIMIT_ACCOUNT
+        self._buckets = {
+            endpoint: TokenBucket(*limit) for endpoint, limit in limits.items()
+        }
+        self._account = TokenBucket(*account_limit)
+        # Heap of (priority, arrival, endpoint, future)
+        self._queue: list = []
+        self._arrivals = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {endpoint: QueueStats() for endpoint in limits}
+
+    async def acquire(self, endpoint: str, priority: Optional[int] = None) -> float:
+        """Wait until a request to ``endpoint`` may be sent.
+
+        Returns the seconds spent waiting.
+        """
+        stats = self.stats[endpoint]
+        stats.requests += 1
+        now = time.monotonic()
+        bucket = self._buckets[endpoint]
+        if not self._queue and bucket.available(now) and self._account.available(now):
+            bucket.take()
+            self._account.take()
+            stats.wait.record(0)
+            return 0.0
+
+        if priority is None:
+            priority = ENDPOINT_PRIORITIES[endpoint]
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._arrivals), endpoint, future))
+        stats.throttled += 1
+        stats.waiting += 1
+        stats.max_waiting = max(stats.max_waiting, stats.waiting)
+        _LOGGER.debug("Request to %s queued behind %d", endpoint, len(self._queue) - 1)
+        self._dispatch()
+        try:
+            await future
+        finally:
+            stats.waiting -= 1
+        waited = time.monotonic() - now
+        stats.wait.record(waited * 1000)
+        return waited
+
+    def _dispatch(self) -> None:
+        """Release the waiters that may go now and wait for the next token."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        now = time.monotonic()
+        delay = None
+        blocked = []
+        while self._queue:
+            if not self._account.available(now):
+                delay = self._account.delay(now)
+                break
+            item = heapq.heappop(self._queue)
+            future = item[3]
+            if future.done():
+                # The caller gave up waiting
+                continue
+            bucket = self._buckets[item[2]]
+            if bucket.available(now):
+                bucket.take()
+                self._account.take()
+                future.set_result(None)
+            else:
+                blocked.append(item)
+                wait = bucket.delay(now)
+                delay = wait if delay is None else min(delay, wait)
+
+        for item in blocked:
+            heapq.heappush(self._queue, item)
+        if self._queue and delay is not None:
+            self._timer = asyncio.get_running_loop().call_later(
+                delay, self._dispatch
+            )
+
+    def as_dict(self) -> dict:
+        """Return the queue statistics of every endpoint."""
+        return {endpoint: stats.as_dict() for endpoint, stats in self.stats.items()}
+
+    def close(self) -> None:
+        """Stop the dispatch timer and cancel the waiting requests."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for item in self._queue:
+            item[3].cancel()
+        self._queue.clear()
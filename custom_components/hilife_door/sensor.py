@@ -0,0 +1,247 @@
+"""Sensor platform for HiLife Door integration."""
+import logging
+from typing import Optional
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, ENDPOINTS, METRICS_UPDATE_DELAY
+from .history import OpenHistory
+from .metrics import EndpointMetrics
+from .models import Door
+from .resilience import STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, CircuitBreaker
+from .scheduler import QueueStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def entry_device_info(entry: ConfigEntry) -> DeviceInfo:
+    """Return the service device that holds the entry's diagnostic entities."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=entry.title,
+        manufacturer="HiLife 合生活",
+        model="Cloud",
+        entry_type=DeviceEntryType.SERVICE,
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up HiLife Door diagnostic and last-open sensors."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    api = data["api"]
+    coordinator = data["coordinator"]
+    history = data["history"]
+
+    entities = [
+        HiLifeCircuitSensor(entry, breaker) for breaker in api.breakers.values()
+    ]
+    entities.extend(
+        HiLifeLatencySensor(
+            entry,
+            endpoint,
+            api.metrics.endpoints[endpoint],
+            api.scheduler.stats[endpoint],
+        )
+        for endpoint in ENDPOINTS
+    )
+    async_add_entities(entities)
+
+    device_info = data["device_info"]
+    last_open: dict = {}
+
+    @callback
+    def _async_sync_entities() -> None:
+        """Add a last-open sensor for every new door, drop revoked ones."""
+        doors = coordinator.data or {}
+
+        new_entities = [
+            HiLifeLastOpenSensor(history, door, device_info[door.community_id])
+            for door_id, door in doors.items()
+            if door_id not in last_open
+        ]
+        for entity in new_entities:
+            last_open[entity.door_id] = entity
+
+        removed = [door_id for door_id in last_open if door_id not in doors]
+        if removed:
+            entity_registry = er.async_get(hass)
+            for door_id in removed:
+                entity = last_open.pop(door_id)
+                if entity.registry_entry is not None:
+                    entity_registry.async_remove(entity.entity_id)
+                else:
+                    hass.async_create_task(entity.async_remove())
+
+        if new_entities:
+            async_add_entities(new_entities)
+
+    _async_sync_entities()
+    entry.async_on_unload(coordinator.async_add_sync_listener(_async_sync_entities))
+
+
+class HiLifeCircuitSensor(SensorEntity):
+    """Circuit breaker state of one HiLife cloud host."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_options = [STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN]
+    _attr_should_poll = False
+    _attr_translation_key = "circuit"
+
+    def __init__(self, entry: ConfigEntry, breaker: CircuitBreaker):
+        """Initialize the sensor."""
+        self._breaker = breaker
+        self._attr_unique_id = f"{entry.entry_id}_circuit_{breaker.host}"
+        self._attr_name = f"{entry.title} {breaker.host}"
+        self._attr_device_info = entry_device_info(entry)
+
+    @property
+    def native_value(self) -> str:
+        """Return the circuit state."""
+        return self._breaker.state
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the failure count."""
+        return {"host": self._breaker.host, "failures": self._breaker.failures}
+
+    async def async_added_to_hass(self) -> None:
+        """Follow circuit state changes."""
+        self.async_on_remove(self._breaker.add_listener(self.async_write_ha_state))
+
+
+class HiLifeLatencySensor(SensorEntity):
+    """p95 latency, call counts and rate limiter queue of one endpoint.
+
+    Updated when the endpoint is called, writing the calls of the next
+    ``METRICS_UPDATE_DELAY`` seconds as one state.
+    """
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_should_poll = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _unsub_update: Optional[CALLBACK_TYPE] = None
+
+    def __init__(
+        self,
+        entry: ConfigEntry,
+        endpoint: str,
+        metrics: EndpointMetrics,
+        queue: QueueStats,
+    ):
+        """Initialize the sensor."""
+        self._metrics = metrics
+        self._queue = queue
+        self._attr_unique_id = f"{entry.entry_id}_latency_{endpoint}"
+        self._attr_name = f"{entry.title} {endpoint} p95"
+        self._attr_device_info = entry_device_info(entry)
+
+    async def async_added_to_hass(self) -> None:
+        """Follow the calls of the endpoint."""
+        self._snapshot()
+        self.async_on_remove(self._metrics.add_listener(self._async_call_recorded))
+        self.async_on_remove(self._async_cancel_update)
+
+    @callback
+    def _async_call_recorded(self) -> None:
+        """Schedule a state update unless one is pending."""
+        if self._unsub_update is None:
+            self._unsub_update = async_call_later(
+                self.hass, METRICS_UPDATE_DELAY, self._async_update
+            )
+
+    @callback
+    def _async_cancel_update(self) -> None:
+        """Cancel a pending state update."""
+        if self._unsub_update is not None:
+            self._unsub_update()
+            self._unsub_update = None
+
+    @callback
+    def _async_update(self, _now) -> None:
+        """Write the metrics recorded since the last update."""
+        self._unsub_update = None
+        self._snapshot()
+        self.async_write_ha_state()
+
+    def _snapshot(self) -> None:
+        """Take a snapshot of the endpoint metrics."""
+        snapshot = self._metrics.as_dict()
+        latency = snapshot.pop("latency_ms")
+        queue = self._queue.as_dict()
+        self._attr_native_value = latency["p95"]
+        self._attr_extra_state_attributes = {
+            "p50": latency["p50"],
+            "p99": latency["p99"],
+            **snapshot,
+            "queue_depth": queue["waiting"],
+            "queue_max_depth": queue["max_waiting"],
+            "throttled": queue["throttled"],
+            "queue_wait_p50": queue["wait_ms"]["p50"],
+            "queue_wait_p95": queue["wait_ms"]["p95"],
+        }
+
+
+class HiLifeLastOpenSensor(SensorEntity):
+    """Time and outcome of the last open attempt of one door."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_should_poll = False
+
+    def __init__(self, history: OpenHistory, door: Door, device_info: DeviceInfo):
+        """Initialize the sensor."""
+        self._history = history
+        self.door_id = door.id
+        self._record = history.last.get(str(self.door_id))
+        self._attr_unique_id = f"hilife_door_{self.door_id}_last_open"
+        self._attr_name = f"{door.name} 最近开门"
+        self._attr_device_info = device_info
+
+    @property
+    def native_value(self):
+        """Return when the door was last opened."""
+        if self._record is None:
+            return None
+        return dt_util.parse_datetime(self._record["time"])
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        """Return the outcome of the last open attempt."""
+        if self._record is None:
+            return {}
+        return {
+            key: value
+            for key, value in self._record.items()
+            if key not in ("time", "door_id", "name")
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Follow open attempts of this door."""
+        self.async_on_remove(
+            self._history.async_add_listener(self.door_id, self._async_record)
+        )
+
+    @callback
+    def _async_record(self, record: dict) -> None:
+        """Show a new open attempt."""
+        self._record = record
+        self.async_write_ha_state()
@@ -0,0 +1,340 @@
+"""Services for the HiLife Door integration."""
+import asyncio
+import logging
+import time
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    ATTR_CALLS,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_DOOR_ID,
+    ATTR_DURATION,
+    ATTR_EXPIRES_IN,
+    ATTR_MAX_CONCURRENCY,
+    ATTR_MODE,
+    ATTR_NAME,
+    ATTR_ONE_TIME,
+    ATTR_ORDERED,
+    ATTR_RELOAD,
+    ATTR_STAGGER,
+    ATTR_STALL_THRESHOLD,
+    DATA_ACCOUNTS,
+    DATA_HANDOFFS,
+    DATA_INDEX,
+    DATA_PROFILER,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_PROFILE_DURATION,
+    DEFAULT_STALL_THRESHOLD,
+    DEFAULT_TOKEN_EXPIRES_IN,
+    DOMAIN,
+    PROFILE_MODES,
+    SERVICE_CREATE_WEBHOOK_TOKEN,
+    SERVICE_OPEN_BY_NAME,
+    SERVICE_OPEN_DOORS,
+    SERVICE_PROFILE,
+)
+from .profiler import ProfileSession
+from .webhook import async_webhook_url, token_expiry
+
+_LOGGER = logging.getLogger(__name__)
+
+OPEN_DOORS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Optional(ATTR_ENTITY_ID): cv.entity_ids,
+            vol.Optional(ATTR_DOOR_ID): vol.All(cv.ensure_list, [cv.string]),
+            vol.Optional(
+                ATTR_MAX_CONCURRENCY, default=DEFAULT_MAX_CONCURRENCY
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=20)),
+            vol.Optional(ATTR_STAGGER, default=0): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=10)
+            ),
+            vol.Optional(ATTR_ORDERED, default=False): cv.boolean,
+        }
+    ),
+    cv.has_at_least_one_key(ATTR_ENTITY_ID, ATTR_DOOR_ID),
+)
+
+OPEN_BY_NAME_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+CREATE_WEBHOOK_TOKEN_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_DOOR_ID): cv.string,
+        vol.Optional(ATTR_EXPIRES_IN, default=DEFAULT_TOKEN_EXPIRES_IN): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=7 * 24 * 3600)
+        ),
+        vol.Optional(ATTR_ONE_TIME, default=False): cv.boolean,
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(ATTR_CALLS): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(ATTR_MODE, default=PROFILE_MODES[0]): vol.In(PROFILE_MODES),
+        vol.Optional(
+            ATTR_STALL_THRESHOLD, default=DEFAULT_STALL_THRESHOLD
+        ): vol.All(vol.Coerce(float), vol.Range(min=1)),
+        vol.Optional(ATTR_RELOAD, default=False): cv.boolean,
+    }
+)
+
+
+@callback
+def _async_door_entities(hass: HomeAssistant) -> list:
+    """Return the lock entities of every loaded config entry."""
+    return [
+        entity
+        for key, data in hass.data.get(DOMAIN, {}).items()
+        if key not in (DATA_ACCOUNTS, DATA_HANDOFFS, DATA_INDEX, DATA_PROFILER)
+        for entity in data.get("entities", {}).values()
+    ]
+
+
+@callback
+def _async_resolve_targets(hass: HomeAssistant, call: ServiceCall) -> list:
+    """Resolve the service targets to (requested target, entity or None)."""
+    entities = _async_door_entities(hass)
+    by_entity_id = {entity.entity_id: entity for entity in entities}
+    by_door_id = {str(entity.door_id): entity for entity in entities}
+
+    targets = [
+        (entity_id, by_entity_id.get(entity_id))
+        for entity_id in call.data.get(ATTR_ENTITY_ID, [])
+    ]
+    targets.extend(
+        (door_id, by_door_id.get(door_id))
+        for door_id in call.data.get(ATTR_DOOR_ID, [])
+    )
+    return targets
+
+
+async def _async_open_doors(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Open several doors concurrently and report per-door results."""
+    targets = _async_resolve_targets(hass, call)
+    stagger = call.data[ATTR_STAGGER]
+    semaphore = asyncio.Semaphore(
+        1 if call.data[ATTR_ORDERED] else call.data[ATTR_MAX_CONCURRENCY]
+    )
+    start = time.monotonic()
+
+    async def open_one(index: int, target: str, entity) -> dict:
+        if entity is None:
+            return {"target": target, "success": False, "msg": "Unknown door"}
+        if entity.hass is None:
+            # Disabled in the entity registry, or removed, so never added
+            return {
+                "target": target,
+                "entity_id": entity.entity_id,
+                "door_id": entity.door_id,
+                "success": False,
+                "msg": "Unavailable",
+            }
+
+        if stagger:
+            await asyncio.sleep(index * stagger)
+        async with semaphore:
+            door_start = time.monotonic()
+            result = await entity.async_open_door(call.context)
+
+        return {
+            "target": target,
+            "entity_id": entity.entity_id,
+            "door_id": entity.door_id,
+            "name": entity.name,
+            "success": result.get("status") == 1,
+            "status": result.get("status"),
+            "msg": result.get("msg"),
+            "elapsed_ms": round((time.monotonic() - door_start) * 1000, 1),
+        }
+
+    # asyncio.Semaphore wakes waiters in FIFO order, so an ordered call
+    # opens the doors one after another in the order they were given
+    results = await asyncio.gather(
+        *(open_one(index, *target) for index, target in enumerate(targets))
+    )
+    _LOGGER.debug(
+        "Opened %d of %d doors", sum(r["success"] for r in results), len(results)
+    )
+    return {
+        "results": list(results),
+        "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
+    }
+
+
+async def _async_open_by_name(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Open the one door whose name, pinyin, prefix or id matches."""
+    name = call.data[ATTR_NAME]
+    index = hass.data.get(DOMAIN, {}).get(DATA_INDEX)
+    entry_ids = (
+        [call.data[ATTR_CONFIG_ENTRY_ID]] if ATTR_CONFIG_ENTRY_ID in call.data else None
+    )
+    matches = index.resolve(name, entry_ids) if index is not None else []
+    if not matches:
+        raise HomeAssistantError(f"No door matches {name}")
+    if len(matches) > 1:
+        candidates = "、".join(
+            f"{hass.data[DOMAIN][entry_id]['communities'][door.community_id]['name']}"
+            f" {door.name}"
+            for entry_id, door in matches[:10]
+        )
+        raise HomeAssistantError(f"{name} matches {len(matches)} doors: {candidates}")
+
+    entry_id, door = matches[0]
+    entity = hass.data[DOMAIN][entry_id].get("entities", {}).get(door.id)
+    if entity is None or entity.hass is None:
+        raise HomeAssistantError(f"Door {door.name} is not available")
+
+    start = time.monotonic()
+    result = await entity.async_open_door(call.context)
+    return {
+        "entity_id": entity.entity_id,
+        "door_id": door.id,
+        "name": door.name,
+        "success": result.get("status") == 1,
+        "status": result.get("status"),
+        "msg": result.get("msg"),
+        "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
+    }
+
+
+@callback
+def _async_create_webhook_token(
+    hass: HomeAssistant, call: ServiceCall
+) -> ServiceResponse:
+    """Create a temporary token for the webhook of one entry."""
+    door_id = call.data.get(ATTR_DOOR_ID)
+    entries = [
+        entry
+        for entry in hass.config_entries.async_entries(DOMAIN)
+        if entry.entry_id in hass.data.get(DOMAIN, {})
+        and call.data.get(ATTR_CONFIG_ENTRY_ID, entry.entry_id) == entry.entry_id
+    ]
+    if door_id is not None:
+        entries = [
+            entry
+            for entry in entries
+            if door_id
+            in {
+                str(key)
+                for key in hass.data[DOMAIN][entry.entry_id].get("entities", {})
+            }
+        ]
+    if len(entries) != 1:
+        raise HomeAssistantError(
+            f"{len(entries)} matching HiLife Door entries, "
+            f"pass {ATTR_CONFIG_ENTRY_ID} or a known {ATTR_DOOR_ID}"
+        )
+
+    entry = entries[0]
+    expires_in = call.data[ATTR_EXPIRES_IN]
+    token = hass.data[DOMAIN][entry.entry_id]["webhook_tokens"].create(
+        door_id, expires_in, call.data[ATTR_ONE_TIME]
+    )
+    return {
+        "url": async_webhook_url(hass, entry),
+        "token": token,
+        "door_id": door_id,
+        "expires_at": token_expiry(expires_in),
+        "one_time": call.data[ATTR_ONE_TIME],
+    }
+
+
+async def _async_profile(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Profile setups, refreshes and door opens for a while."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if DATA_PROFILER in data:
+        raise HomeAssistantError("A profile is already running")
+
+    session = data[DATA_PROFILER] = ProfileSession(
+        hass,
+        call.data[ATTR_MODE],
+        call.data.get(ATTR_CALLS),
+        call.data[ATTR_STALL_THRESHOLD] / 1000,
+    )
+    session.start()
+    try:
+        if call.data[ATTR_RELOAD]:
+            # Set the entries up again to profile their setup
+            for entry in hass.config_entries.async_entries(DOMAIN):
+                if entry.entry_id in data:
+                    await hass.config_entries.async_reload(entry.entry_id)
+        await session.async_wait(call.data[ATTR_DURATION])
+    finally:
+        session.stop()
+        del data[DATA_PROFILER]
+    return await session.async_save()
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the HiLife Door services."""
+
+    async def async_open_doors(call: ServiceCall) -> ServiceResponse:
+        return await _async_open_doors(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_OPEN_DOORS,
+        async_open_doors,
+        schema=OPEN_DOORS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_open_by_name(call: ServiceCall) -> ServiceResponse:
+        return await _async_open_by_name(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_OPEN_BY_NAME,
+        async_open_by_name,
+        schema=OPEN_BY_NAME_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    @callback
+    def async_create_webhook_token(call: ServiceCall) -> ServiceResponse:
+        return _async_create_webhook_token(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CREATE_WEBHOOK_TOKEN,
+        async_create_webhook_token,
+        schema=CREATE_WEBHOOK_TOKEN_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        return await _async_profile(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
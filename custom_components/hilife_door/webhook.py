@@ -0,0 +1,191 @@
+"""Webhook that opens doors without going through the service pipeline."""
+import hmac
+import logging
+import secrets
+import time
+from datetime import timedelta
+from typing import Optional
+
+from aiohttp import web
+
+from homeassistant.components import webhook
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import Context, HomeAssistant, callback
+from homeassistant.helpers.network import NoURLAvailableError
+from homeassistant.util import dt as dt_util
+
+from .api import json_dumps, json_loads
+from .const import (
+    ATTR_DOOR_ID,
+    CONF_WEBHOOK_ID,
+    CONF_WEBHOOK_SECRET,
+    WEBHOOK_MAX_TOKENS,
+    WEBHOOK_SECRET_HEADER,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WebhookTokens:
+    """Temporary tokens accepted by the webhook of one entry.
+
+    A token expires after a while, after its first use, or both, and may
+    be limited to one door. Tokens are only kept in memory, so a restart
+    revokes them.
+    """
+
+    def __init__(self):
+        """Initialize the tokens."""
+        # token -> (door id or None, monotonic expiry or None, one time)
+        self._tokens: dict = {}
+
+    def create(
+        self, door_id=None, expires_in: Optional[float] = None, one_time: bool = False
+    ) -> str:
+        """Return a new token."""
+        self._prune()
+        while len(self._tokens) >= WEBHOOK_MAX_TOKENS:
+            # Drop the oldest token
+            del self._tokens[next(iter(self._tokens))]
+        token = secrets.token_urlsafe(16)
+        expires = time.monotonic() + expires_in if expires_in else None
+        self._tokens[token] = (
+            None if door_id is None else str(door_id),
+            expires,
+            one_time,
+        )
+        return token
+
+    def consume(self, token: str, door_id) -> bool:
+        """Return True if ``token`` may open ``door_id``, using it up if needed."""
+        grant = self._tokens.get(token)
+        if grant is None:
+            return False
+        door, expires, one_time = grant
+        if expires is not None and time.monotonic() >= expires:
+            del self._tokens[token]
+            return False
+        if door is not None and door != str(door_id):
+            return False
+        if one_time:
+            del self._tokens[token]
+        return True
+
+    def _prune(self) -> None:
+        """Forget expired tokens."""
+        now = time.monotonic()
+        for token in [
+            token
+            for token, (_, expires, _) in self._tokens.items()
+            if expires is not None and now >= expires
+        ]:
+            del self._tokens[token]
+
+
+def _response(status: int, data: dict) -> web.Response:
+    """Return a JSON response."""
+    return web.Response(
+        body=json_dumps(data), status=status, content_type="application/json"
+    )
+
+
+@callback
+def async_webhook_url(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    """Return the URL of an entry's webhook, or its path without a base URL."""
+    webhook_id = entry.data[CONF_WEBHOOK_ID]
+    try:
+        return webhook.async_generate_url(hass, webhook_id)
+    except NoURLAvailableError:
+        return webhook.async_generate_path(webhook_id)
+
+
+@callback
+def async_register_webhook(hass: HomeAssistant, entry: ConfigEntry, data: dict) -> None:
+    """Register the webhook of an entry until it is unloaded.
+
+    The webhook id and secret are created the first time.
+
+    Callers POST ``door_id`` in the query string or a JSON body and
+    authenticate with the entry's secret, in the ``X-HiLife-Secret``
+    header or as ``secret``, or with a temporary ``token``. The door is
+    opened on the same path as the lock entity and the response carries
+    the cloud's ``status`` and ``msg`` as soon as the cloud answers.
+    """
+    if CONF_WEBHOOK_ID not in entry.data:
+        hass.config_entries.async_update_entry(
+            entry,
+            data={
+                **entry.data,
+                CONF_WEBHOOK_ID: webhook.async_generate_id(),
+                CONF_WEBHOOK_SECRET: secrets.token_urlsafe(24),
+            },
+        )
+    secret = entry.data[CONF_WEBHOOK_SECRET]
+    tokens: WebhookTokens = data["webhook_tokens"]
+
+    async def async_handle_webhook(
+        hass: HomeAssistant, webhook_id: str, request: web.Request
+    ) -> web.Response:
+        start = time.perf_counter()
+        params = request.query
+        if request.body_exists:
+            try:
+                params = {**params, **(json_loads(await request.read()) or {})}
+            except (TypeError, ValueError):
+                return _response(400, {"status": -1, "msg": "Invalid JSON"})
+
+        door_id = params.get(ATTR_DOOR_ID)
+        entities = data.get("entities", {})
+        entity = entities.get(door_id)
+        if entity is None and isinstance(door_id, str) and door_id.isdigit():
+            entity = entities.get(int(door_id))
+        available = entity is not None and entity.hass is not None
+
+        given = request.headers.get(WEBHOOK_SECRET_HEADER) or params.get("secret")
+        if given is not None:
+            authorized = hmac.compare_digest(str(given).encode(), secret.encode())
+        else:
+            # Only use up a one-time token on a door it can actually open
+            token = params.get("token")
+            authorized = (
+                token is not None
+                and available
+                and tokens.consume(str(token), door_id)
+            )
+        if not authorized:
+            _LOGGER.warning("Rejected webhook call for door %s", door_id)
+            return _response(401, {"status": -1, "msg": "Unauthorized"})
+        if not available:
+            return _response(404, {"status": -1, "msg": "Unknown door"})
+
+        opened = time.perf_counter()
+        result = await entity.async_open_door(Context())
+        done = time.perf_counter()
+        return _response(
+            200,
+            {
+                "door_id": entity.door_id,
+                "status": result.get("status"),
+                "msg": result.get("msg"),
+                "elapsed_ms": round((done - opened) * 1000, 1),
+                "latency_ms": round((done - start) * 1000, 1),
+            },
+        )
+
+    webhook_id = entry.data[CONF_WEBHOOK_ID]
+    webhook.async_register(
+        hass,
+        entry.domain,
+        entry.title,
+        webhook_id,
+        async_handle_webhook,
+        allowed_methods=["POST"],
+    )
+    entry.async_on_unload(lambda: webhook.async_unregister(hass, webhook_id))
+
+
+def token_expiry(expires_in: Optional[float]) -> Optional[str]:
+    """Return when a token created now with ``expires_in`` expires."""
+    if not expires_in:
+        return None
+    return (dt_util.utcnow() + timedelta(seconds=expires_in)).isoformat()